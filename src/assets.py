@@ -0,0 +1,97 @@
+# assets.py
+# Author: Henry Shi
+
+import argparse
+import os
+
+# The images directory, found from this file so the working directory does not matter
+IMAGES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'images'))
+
+PIECE_NAMES = {'K': 'king', 'Q': 'queen', 'R': 'rook', 'B': 'bishop', 'N': 'knight', 'P': 'pawn'}
+
+# Sprite keys in the order they appear in an atlas, left to right
+SPRITE_KEYS = tuple(f"{rank}_{color}" for rank in PIECE_NAMES for color in ('black', 'white'))
+
+# Scaled sprites already loaded, by square size
+_piece_images = {}
+
+def sprite_path(key):
+    """
+    Get the image file of a sprite.
+
+    Parameters:
+    key (str): The sprite key, such as 'K_black'
+
+    Returns:
+    str: The path of the image file
+    """
+    rank, color = key.split('_')
+    return os.path.join(IMAGES_DIR, f"{PIECE_NAMES[rank]}_{color}.png")
+
+def atlas_path(size):
+    """
+    Get the atlas file of the sprites scaled to a size.
+
+    Parameters:
+    size (int): Width and height of a sprite in pixels
+
+    Returns:
+    str: The path of the atlas file
+    """
+    return os.path.join(IMAGES_DIR, f"atlas_{size}.png")
+
+def load_piece_images(size=100):
+    """
+    Get the piece sprites scaled to a size, loading them on first use.
+
+    If an atlas for the size exists (see build_atlas), the sprites are cut
+    from it; otherwise each image is loaded and scaled on its own.
+
+    Parameters:
+    size (int): Width and height of a sprite in pixels
+
+    Returns:
+    dict: Sprites keyed like 'K_black'
+    """
+    images = _piece_images.get(size)
+    if images is not None:
+        return images
+
+    import pygame
+    atlas_file = atlas_path(size)
+    if os.path.exists(atlas_file):
+        atlas = pygame.image.load(atlas_file)
+        images = {key: atlas.subsurface((index * size, 0, size, size)) for index, key in enumerate(SPRITE_KEYS)}
+    else:
+        images = {key: pygame.transform.scale(pygame.image.load(sprite_path(key)), (size, size)) for key in SPRITE_KEYS}
+    _piece_images[size] = images
+    return images
+
+def build_atlas(size=100):
+    """
+    Scale every sprite to a size and save them side by side in one image.
+
+    Parameters:
+    size (int): Width and height of a sprite in pixels
+
+    Returns:
+    str: The path of the atlas file
+    """
+    import pygame
+    atlas = pygame.Surface((size * len(SPRITE_KEYS), size), pygame.SRCALPHA)
+    for index, key in enumerate(SPRITE_KEYS):
+        atlas.blit(pygame.transform.scale(pygame.image.load(sprite_path(key)), (size, size)), (index * size, 0))
+    filename = atlas_path(size)
+    pygame.image.save(atlas, filename)
+    _piece_images.pop(size, None)
+    return filename
+
+def main():
+    """Build a sprite atlas from the command line."""
+    parser = argparse.ArgumentParser(description="Build a pre-scaled sprite atlas of the piece images")
+    parser.add_argument('--size', type=int, default=100, help="Width and height of a sprite in pixels")
+    args = parser.parse_args()
+    print(f"Wrote {build_atlas(args.size)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# batch_env.py
+# Author: Henry Shi
+
+import numpy as np
+from board import CAN_CAPTURE, COLS, NUM_SQUARES, OWNER_BIT, RANK_IDS, RANK_VALUES, RANKS, REVEALED_BIT, ROWS, SCORE_STEP_LIMIT, STATE_NIBBLES, Board
+
+# Action ids, matching QLearningAgent's ['flip', 'move']
+FLIP, MOVE = 0, 1
+ACTIONS = ('flip', 'move')
+
+# Rank ids and owners of the 32 starting pieces
+_START_RANKS = np.array([RANK_IDS[rank] for rank in 'KQQRRBBBNNNPPPPP'] * 2, dtype=np.int8)
+_START_OWNERS = np.array([1] * 16 + [2] * 16, dtype=np.int8)
+
+_CAN_CAPTURE = np.array(CAN_CAPTURE, dtype=bool)
+_RANK_VALUES = np.array([RANK_VALUES[rank] if rank else 0 for rank in RANKS], dtype=np.float64)
+_STATE_NIBBLES = np.array(STATE_NIBBLES, dtype=np.uint8)
+
+# Row and column offsets in the order used by Board.legal_actions: up, down, left, right
+_DIRECTION_ROWS = np.array([-1, 1, 0, 0])
+_DIRECTION_COLS = np.array([0, 0, -1, 1])
+
+
+class BatchEnv:
+    def __init__(self, num_envs, max_steps=150, seed=None):
+        """
+        Initialize a batch of games played in lockstep on NumPy arrays.
+
+        Each game follows the same rules and rewards as QLearningAgent.step:
+        players alternate, 'flip' reveals a random face-down piece and 'move'
+        plays a random legal move or capture. Finished games are reset
+        automatically.
+
+        Parameters:
+        num_envs (int): Number of games in the batch
+        max_steps (int): Maximum steps (one move by each player) per game
+        seed (int): Seed for shuffling boards and picking squares and moves
+        """
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        shape = (num_envs, ROWS, COLS)
+        self.rank = np.zeros(shape, dtype=np.int8)  # Rank id, 0 for an empty square
+        self.owner = np.zeros(shape, dtype=np.int8)  # 1 or 2, 0 for an empty square
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.player = np.ones(num_envs, dtype=np.int8)  # Player to move
+        self.plies = np.zeros(num_envs, dtype=np.int32)  # Actions played so far
+        self.episodes_completed = 0
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Shuffle new boards into some or all of the games.
+
+        Parameters:
+        mask (np.ndarray): Boolean mask of the games to reset, None for all
+        """
+        index = np.arange(self.num_envs) if mask is None else np.nonzero(mask)[0]
+        if not len(index):
+            return
+        order = self.rng.permuted(np.tile(np.arange(NUM_SQUARES), (len(index), 1)), axis=1)
+        self.rank[index] = _START_RANKS[order].reshape(-1, ROWS, COLS)
+        self.owner[index] = _START_OWNERS[order].reshape(-1, ROWS, COLS)
+        self.revealed[index] = False
+        self.player[index] = 1
+        self.plies[index] = 0
+
+    def _neighbors(self, values, fill, index):
+        """Stack the value of each square's neighbor in every direction (shape k x 4 x ROWS x COLS)."""
+        padded = np.pad(values[index], ((0, 0), (1, 1), (1, 1)), constant_values=fill)
+        return np.stack([padded[:, 1 + dr:1 + dr + ROWS, 1 + dc:1 + dc + COLS]
+                         for dr, dc in zip(_DIRECTION_ROWS, _DIRECTION_COLS)], axis=1)
+
+    def legal_moves(self, players, index=None, revealed_only=True):
+        """
+        Compute which moves and captures are legal in each game.
+
+        Parameters:
+        players (np.ndarray): The player to generate moves for in each selected game
+        index (np.ndarray): The games to look at, None for all
+        revealed_only (bool): Only let revealed pieces move, as the agents do
+
+        Returns:
+        np.ndarray: Boolean array (k x 4 x ROWS x COLS), True where the piece on a
+                    square may step in a direction (up, down, left, right)
+        """
+        if index is None:
+            index = np.arange(self.num_envs)
+        rank = self.rank[index]
+        players = np.asarray(players).reshape(-1, 1, 1)
+        own = (self.owner[index] == players) & (rank > 0)
+        if revealed_only:
+            own &= self.revealed[index]
+        target_rank = self._neighbors(self.rank, -1, index)
+        target_owner = self._neighbors(self.owner, 0, index)
+        target_revealed = self._neighbors(self.revealed, False, index)
+        capture = ((target_rank > 0) & target_revealed & (target_owner != players[:, None])
+                   & _CAN_CAPTURE[rank[:, None], np.maximum(target_rank, 0)])
+        return own[:, None] & ((target_rank == 0) | capture)
+
+    def check_winners(self, step_counts):
+        """
+        Check every game for a winner, as Board.check_winner does.
+
+        Parameters:
+        step_counts (np.ndarray): The current step count of each game
+
+        Returns:
+        np.ndarray: The winner of each game: 1 or 2, 0 for a draw, or -1 if no winner yet
+        """
+        n = self.num_envs
+        winners = np.full(n, -1, dtype=np.int8)
+        occupied = self.rank > 0
+        index = np.nonzero(~(occupied & ~self.revealed).reshape(n, -1).any(axis=1))[0]
+        if not len(index):
+            return winners  # Do not check winner if all pieces are not revealed
+        owner = self.owner[index].reshape(len(index), -1)
+        values = _RANK_VALUES[self.rank[index]].reshape(len(index), -1)
+        count_1 = (owner == 1).sum(axis=1)
+        count_2 = (owner == 2).sum(axis=1)
+        mobile_1 = self.legal_moves(np.full(len(index), 1), index, False).reshape(len(index), -1).any(axis=1)
+        mobile_2 = self.legal_moves(np.full(len(index), 2), index, False).reshape(len(index), -1).any(axis=1)
+        score_1 = (values * (owner == 1)).sum(axis=1)
+        score_2 = (values * (owner == 2)).sum(axis=1)
+        by_score = np.where(score_1 > score_2, 1, np.where(score_2 > score_1, 2, 0))
+        winners[index] = np.select(
+            [count_1 == 0, count_2 == 0, ~mobile_1, ~mobile_2, step_counts[index] >= SCORE_STEP_LIMIT],
+            [2, 1, 2, 1, by_score],
+            default=-1,
+        )
+        return winners
+
+    def step(self, actions):
+        """
+        Play one action for the player to move in every game.
+
+        Parameters:
+        actions (array-like): FLIP or MOVE for each game; a flip with nothing
+                              left to flip is played as a move
+
+        Returns:
+        tuple: Rewards for the player who acted, done flags, and the winner of
+               each game that just ended (1 or 2, 0 for a draw, -1 if it hit
+               max_steps or the player had no move). Games that are done have
+               already been reset when this returns.
+        """
+        n = self.num_envs
+        actions = np.asarray(actions)
+        players = self.player.copy()
+        step_counts = self.plies // 2
+        rewards = np.zeros(n, dtype=np.float32)
+        dones = np.zeros(n, dtype=bool)
+
+        hidden = ((self.rank > 0) & ~self.revealed).reshape(n, -1)
+        flip = (actions == FLIP) & hidden.any(axis=1)
+
+        # Flip a random face-down piece
+        index = np.nonzero(flip)[0]
+        if len(index):
+            scores = np.where(hidden[index], self.rng.random((len(index), NUM_SQUARES)), -1.0)
+            rows, cols = np.divmod(scores.argmax(axis=1), COLS)
+            self.revealed[index, rows, cols] = True
+            rewards[index] = -1
+
+        # Play a random legal move or capture
+        index = np.nonzero(~flip)[0]
+        if len(index):
+            legal = self.legal_moves(players[index], index).reshape(len(index), -1)
+            can_move = legal.any(axis=1)
+            stuck = index[~can_move]
+            rewards[stuck] = -1
+            dones[stuck] = True
+            index = index[can_move]
+            scores = np.where(legal[can_move], self.rng.random((len(index), legal.shape[1])), -1.0)
+            directions, rows, cols = np.unravel_index(scores.argmax(axis=1), (4, ROWS, COLS))
+            to_rows = rows + _DIRECTION_ROWS[directions]
+            to_cols = cols + _DIRECTION_COLS[directions]
+            mover = self.rank[index, rows, cols]
+            target = self.rank[index, to_rows, to_cols]
+            mutual = (target > 0) & (target == mover)  # Equal ranks remove each other
+            self.rank[index, to_rows, to_cols] = np.where(mutual, 0, mover)
+            self.owner[index, to_rows, to_cols] = np.where(mutual, 0, self.owner[index, rows, cols])
+            self.revealed[index, to_rows, to_cols] = ~mutual
+            self.rank[index, rows, cols] = 0
+            self.owner[index, rows, cols] = 0
+            self.revealed[index, rows, cols] = False
+            rewards[index] = np.where(target > 0, 4, -1)
+
+        winners = self.check_winners(step_counts)
+        ended = winners >= 0
+        rewards[ended & (winners == players)] += 80
+        self.plies += 1
+        dones |= ended | (self.plies >= 2 * self.max_steps)
+        winners[dones & ~ended] = -1
+
+        self.player = np.where(players == 1, 2, 1).astype(np.int8)
+        self.episodes_completed += int(dones.sum())
+        self.reset(dones)
+        return rewards, dones, winners
+
+    def squares(self):
+        """
+        Encode every game as Board.squares values.
+
+        Returns:
+        np.ndarray: uint8 array (num_envs x 32)
+        """
+        codes = (self.rank.astype(np.uint8) | np.where(self.owner == 2, OWNER_BIT, 0).astype(np.uint8)
+                 | np.where(self.revealed & (self.rank > 0), REVEALED_BIT, 0).astype(np.uint8))
+        return codes.reshape(self.num_envs, NUM_SQUARES)
+
+    def state_keys(self):
+        """
+        Get the packed state of every game, as QLearningAgent.get_state returns it.
+
+        Returns:
+        list: One packed state int per game
+        """
+        nibbles = _STATE_NIBBLES[self.squares()]
+        packed = nibbles[:, 0::2] | (nibbles[:, 1::2] << 4)
+        return [int.from_bytes(row.tobytes(), 'little') for row in packed]
+
+    def to_board(self, i):
+        """
+        Copy one game of the batch into a Board.
+
+        Parameters:
+        i (int): Index of the game
+
+        Returns:
+        Board: The board of that game
+        """
+        return Board(bytes(self.squares()[i]))
@@ -0,0 +1,15 @@
+# __init__.py
+# Author: Henry Shi
+
+from benchmarks.micro import bench_micro
+from benchmarks.perft import bench_perft, perft
+from benchmarks.search import bench_search
+from benchmarks.training import bench_training
+
+# Suite name -> function taking quick and returning a JSON-serializable dict
+SUITES = {
+    'perft': bench_perft,
+    'search': bench_search,
+    'micro': bench_micro,
+    'training': bench_training,
+}
@@ -0,0 +1,42 @@
+# __main__.py
+# Author: Henry Shi
+
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks import SUITES
+
+def main():
+    """
+    Run the benchmark suites and print or save the results as JSON.
+
+    Run from the src directory: python -m benchmarks [--quick] [--suite NAME] [--output FILE]
+    """
+    parser = argparse.ArgumentParser(description="Flip Chess performance benchmarks")
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help="Suite to run (repeatable), default all")
+    parser.add_argument('--quick', action='store_true', help="Smaller workloads for a fast check")
+    parser.add_argument('--output', help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quick': args.quick,
+        'suites': {},
+    }
+    for name in args.suite or SUITES:
+        print(f"Running {name}...", file=sys.stderr)
+        results['suites'][name] = SUITES[name](args.quick)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
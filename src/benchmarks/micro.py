@@ -0,0 +1,53 @@
+# micro.py
+# Author: Henry Shi
+
+import time
+from benchmarks.scenarios import SCENARIOS, make_board
+from qlearning_agent import QLearningAgent
+
+REPEATS = 5
+CALLS = 20000
+QUICK_CALLS = 2000
+
+def time_call(function, calls):
+    """
+    Time a function with no arguments.
+
+    Parameters:
+    function (callable): The function to time
+    calls (int): Calls per repeat
+
+    Returns:
+    float: The best time per call in microseconds over REPEATS repeats
+    """
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+def bench_micro(quick=False):
+    """
+    Time the board calls made on every step of training and search.
+
+    Parameters:
+    quick (bool): Make fewer calls
+
+    Returns:
+    dict: Per scenario, microseconds per call of each operation
+    """
+    calls = QUICK_CALLS if quick else CALLS
+    agent = QLearningAgent(actions=['flip', 'move'], player=1)
+    results = {}
+    for name in SCENARIOS:
+        board = make_board(name)
+        results[name] = {
+            'check_winner_us': time_call(lambda: board.check_winner(0), calls),
+            'get_state_us': time_call(board.get_state, calls),
+            'agent_get_state_us': time_call(lambda: agent.get_state(board), calls),
+            'valid_moves_us': time_call(lambda: board.valid_moves(1), calls),
+            'copy_us': time_call(board.copy, calls),
+        }
+    return results
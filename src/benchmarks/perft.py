@@ -0,0 +1,65 @@
+# perft.py
+# Author: Henry Shi
+
+import time
+from benchmarks.scenarios import make_board
+
+# Scenario -> perft depths measured (full run, quick run)
+PERFT_DEPTHS = {
+    'opening': (4, 3),
+    'midgame': (4, 3),
+    'endgame': (5, 4),
+}
+
+def perft(board, depth, player):
+    """
+    Count the positions reached by playing every action to a fixed depth.
+
+    The actions of a player are every legal move of a revealed piece and a
+    reveal of every face-down square. Reveals turn up the piece that is really
+    there, so the count is exact for a given board.
+
+    Parameters:
+    board (Board): The board, restored before returning
+    depth (int): Number of plies to play
+    player (int): The player to move
+
+    Returns:
+    int: The number of leaf positions
+    """
+    if depth == 0:
+        return 1
+    moves = board.valid_moves(player)
+    reveals = board.unrevealed_positions()
+    if depth == 1:
+        return len(moves) + len(reveals)
+    nodes = 0
+    for move in moves:
+        record = board.apply_move(*move)
+        nodes += perft(board, depth - 1, 3 - player)
+        board.undo(record)
+    for pos in reveals:
+        record = board.apply_reveal(pos)
+        nodes += perft(board, depth - 1, 3 - player)
+        board.undo(record)
+    return nodes
+
+def bench_perft(quick=False):
+    """
+    Time perft on every scenario.
+
+    Parameters:
+    quick (bool): Use the shallower depths
+
+    Returns:
+    dict: Per scenario, the depth, node count, seconds and nodes per second
+    """
+    results = {}
+    for name, depths in PERFT_DEPTHS.items():
+        depth = depths[quick]
+        board = make_board(name)
+        start = time.perf_counter()
+        nodes = perft(board, depth, 1)
+        seconds = time.perf_counter() - start
+        results[name] = {'depth': depth, 'nodes': nodes, 'seconds': seconds, 'nodes_per_sec': nodes / seconds}
+    return results
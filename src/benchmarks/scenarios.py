@@ -0,0 +1,39 @@
+# scenarios.py
+# Author: Henry Shi
+
+import random
+from board import Board
+
+# name -> (seed, squares revealed, random moves played afterwards)
+SCENARIOS = {
+    'opening': (1, 0, 0),
+    'midgame': (2, 16, 10),
+    'endgame': (3, 32, 40),
+}
+
+def make_board(name):
+    """
+    Build one of the fixed benchmark positions.
+
+    The same name always gives the same board, so results can be compared
+    between runs and machines. The caller's random module state is left alone.
+
+    Parameters:
+    name (str): A key of SCENARIOS
+
+    Returns:
+    Board: The board of that scenario
+    """
+    seed, revealed, moves = SCENARIOS[name]
+    board = Board(rng=random.Random(seed))
+    rng = random.Random(seed)
+    for pos in rng.sample(board.unrevealed_positions(), revealed):
+        board.apply_reveal(pos)
+    player = 1
+    for _ in range(moves):
+        valid_moves = board.valid_moves(player)
+        if not valid_moves:
+            break
+        board.apply_move(*rng.choice(valid_moves))
+        player = 3 - player
+    return board
@@ -0,0 +1,43 @@
+# search.py
+# Author: Henry Shi
+
+import time
+from benchmarks.scenarios import make_board
+from minmax_agent import MinMaxAgent
+
+# The opening is left out: with every piece face down each ply is a chance
+# node, and depths past 4 take minutes
+SEARCH_SCENARIOS = ('midgame', 'endgame')
+SEARCH_DEPTHS = range(1, 7)
+QUICK_SEARCH_DEPTHS = range(1, 4)
+
+def bench_search(quick=False):
+    """
+    Time MinMaxAgent.choose_action at each fixed depth.
+
+    Every search starts from a fresh agent (alpha-beta with a transposition
+    table and a fixed seed) on a fresh copy of the scenario, so only the
+    depth changes.
+
+    Parameters:
+    quick (bool): Only search depths 1-3
+
+    Returns:
+    dict: Per scenario and depth, the chosen action, seconds, nodes and nodes per second
+    """
+    results = {}
+    for name in SEARCH_SCENARIOS:
+        results[name] = {}
+        for depth in QUICK_SEARCH_DEPTHS if quick else SEARCH_DEPTHS:
+            board = make_board(name)
+            agent = MinMaxAgent(depth=depth, player=1, alpha_beta=True, tt_capacity=1 << 16, seed=0)
+            start = time.perf_counter()
+            action = agent.choose_action(board, 0)
+            seconds = time.perf_counter() - start
+            results[name][str(depth)] = {
+                'action': repr(action),
+                'seconds': seconds,
+                'nodes': agent.nodes,
+                'nodes_per_sec': agent.nodes / seconds,
+            }
+    return results
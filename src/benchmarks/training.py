@@ -0,0 +1,41 @@
+# training.py
+# Author: Henry Shi
+
+import random
+import time
+import numpy as np
+from qlearning_agent import QLearningAgent
+from train_ai_without_display import play_episode
+
+TRAINING_SEED = 0
+EPISODES = 2000
+QUICK_EPISODES = 200
+
+def bench_training(quick=False):
+    """
+    Measure self-play training throughput.
+
+    Plays the same loop as train_agents_without_display with fresh agents,
+    without reading or writing the saved Q-tables.
+
+    Parameters:
+    quick (bool): Play fewer episodes
+
+    Returns:
+    dict: Episodes, seconds, episodes per second and final Q-table sizes
+    """
+    episodes = QUICK_EPISODES if quick else EPISODES
+    random.seed(TRAINING_SEED)
+    np.random.seed(TRAINING_SEED)
+    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1)
+    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2)
+    start = time.perf_counter()
+    for _ in range(episodes):
+        play_episode(ai_agent_1, ai_agent_2)
+    seconds = time.perf_counter() - start
+    return {
+        'episodes': episodes,
+        'seconds': seconds,
+        'episodes_per_sec': episodes / seconds,
+        'q_table_sizes': [ai_agent_1.table_size(), ai_agent_2.table_size()],
+    }
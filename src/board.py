@@ -3,6 +3,148 @@
 
 import random
 
+ROWS, COLS = 4, 8
+NUM_SQUARES = ROWS * COLS
+
+# Each square is stored as one byte: bits 0-2 hold the rank id, bit 3 the owner
+# (clear for player 1, set for player 2) and bit 4 the revealed flag.
+# A value of 0 means the square is empty.
+RANKS = (None, 'P', 'N', 'B', 'R', 'Q', 'K')
+RANK_IDS = {rank: rank_id for rank_id, rank in enumerate(RANKS) if rank}
+RANK_MASK = 0x07
+OWNER_BIT = 0x08
+REVEALED_BIT = 0x10
+
+RANK_VALUES = {'K': 10, 'Q': 7, 'R': 5, 'B': 4, 'N': 2.5, 'P': 1}
+
+FULL_MASK = (1 << NUM_SQUARES) - 1
+
+# Step count from which check_winner decides the game on material
+SCORE_STEP_LIMIT = 150
+
+# (row, col) of every square index, so callers can get positions without allocating
+POSITIONS = tuple((index // COLS, index % COLS) for index in range(NUM_SQUARES))
+
+# Bitmasks of every square except the first and last column, for shifting sideways
+_NOT_FIRST_COL = sum(1 << index for index in range(NUM_SQUARES) if index % COLS != 0)
+_NOT_LAST_COL = sum(1 << index for index in range(NUM_SQUARES) if index % COLS != COLS - 1)
+
+
+def neighbor_mask(mask):
+    """
+    Get every square orthogonally adjacent to a set of squares.
+
+    Parameters:
+    mask (int): A bitmask of squares
+
+    Returns:
+    int: A bitmask of the neighboring squares
+    """
+    return ((mask << COLS) | (mask >> COLS) | ((mask & _NOT_LAST_COL) << 1) | ((mask & _NOT_FIRST_COL) >> 1)) & FULL_MASK
+
+
+def encode_piece(rank, player, revealed=False):
+    """
+    Encode a piece as a square byte.
+
+    Parameters:
+    rank (str): The rank of the piece (e.g., 'K' for King)
+    player (int): The player to which the piece belongs (1 or 2)
+    revealed (bool): Whether the piece is face up
+
+    Returns:
+    int: The encoded square value
+    """
+    code = RANK_IDS[rank] | (OWNER_BIT if player == 2 else 0)
+    if revealed:
+        code |= REVEALED_BIT
+    return code
+
+
+def code_player(code):
+    """Return the player (1 or 2) owning an encoded, non-empty square."""
+    return 2 if code & OWNER_BIT else 1
+
+
+def _capture_rule(attacker, victim):
+    """Check whether one rank id may capture another (used to build CAN_CAPTURE)."""
+    if attacker == 6:
+        return victim != 1  # King can capture anything except Pawns
+    if attacker == 1:
+        return victim == 6 or victim == 1  # Pawn can only capture Kings and other Pawns
+    return victim <= attacker  # Everything else captures equal or lower ranks
+
+
+# CAN_CAPTURE[attacker][victim] for rank ids 1-6; row and column 0 are padding
+# so the table can be indexed with the rank bits of a square directly. Equal
+# ranks can always capture each other, and such a capture removes both pieces.
+CAN_CAPTURE = tuple(
+    tuple(bool(attacker and victim and _capture_rule(attacker, victim)) for victim in range(len(RANKS)))
+    for attacker in range(len(RANKS))
+)
+
+# ADJACENT[index]: the squares orthogonally next to a square (up, down, left, right)
+ADJACENT = tuple(
+    tuple(
+        row * COLS + col
+        for row, col in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+        if 0 <= row < ROWS and 0 <= col < COLS
+    )
+    for r, c in POSITIONS
+)
+
+
+def _can_enter(code, target):
+    """Check whether the piece encoded as code may step onto a square holding target."""
+    if not target:
+        return True
+    rank, target_rank = code & RANK_MASK, target & RANK_MASK
+    if not target & REVEALED_BIT or (code ^ target) & OWNER_BIT == 0 or rank >= len(RANKS) or target_rank >= len(RANKS):
+        return False
+    return CAN_CAPTURE[rank][target_rank]
+
+
+# _CAN_ENTER[code][target]: whether a piece may move or capture onto a neighboring square
+_CAN_ENTER = tuple(tuple(bool(code) and _can_enter(code, target) for target in range(32)) for code in range(32))
+
+
+# Tuple cell used by get_state for every possible square value
+_STATE_CELLS = tuple(
+    (RANKS[code & RANK_MASK], code_player(code), bool(code & REVEALED_BIT)) if 0 < code & RANK_MASK < len(RANKS) else None
+    for code in range(32)
+)
+
+_SCORE_VALUES = tuple(RANK_VALUES[rank] if rank else 0 for rank in RANKS) + (0,)
+
+# Packed state keys use 4 bits per square (square i at bits 4i-4i+3): 0 for an
+# empty square, HIDDEN_NIBBLE for a face-down piece and the rank id plus owner
+# bit for a revealed one. Face-down pieces are not told apart, as a player
+# can't see them either.
+HIDDEN_NIBBLE = 0x0F
+STATE_NIBBLES = tuple(0 if not code else (code & 0x0F if code & REVEALED_BIT else HIDDEN_NIBBLE) for code in range(32))
+
+# Zobrist keys: one random 64-bit key per (square, square value), zero for an
+# empty square. The hash only covers what the players can see, so every
+# face-down value on a square shares one key, and the pool of hidden pieces is
+# hashed separately with one key per (hidden piece, count). A fixed seed keeps
+# hashes identical across processes and runs.
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_KEYS = []
+for _ in range(NUM_SQUARES):
+    _hidden_key = _zobrist_random.getrandbits(64)
+    ZOBRIST_KEYS.append(tuple(
+        0 if not code else (_zobrist_random.getrandbits(64) if code & REVEALED_BIT else _hidden_key)
+        for code in range(32)
+    ))
+ZOBRIST_KEYS = tuple(ZOBRIST_KEYS)
+ZOBRIST_POOL_KEYS = tuple(
+    tuple(_zobrist_random.getrandbits(64) if count else 0 for count in range(NUM_SQUARES + 1))
+    for _ in range(16)
+)
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)  # Mixed in by the search when player 2 is to move
+del _zobrist_random, _hidden_key
+
+
 class Piece:
     def __init__(self, rank, player):
         """
@@ -20,25 +162,178 @@ class Piece:
         """Reveal the piece."""
         self.revealed = True
 
+
+class _SquarePiece(Piece):
+    """A Piece read from a board square; revealing it writes back to the board."""
+
+    def __init__(self, board, index, code):
+        self.rank = RANKS[code & RANK_MASK]
+        self.player = code_player(code)
+        self.revealed = bool(code & REVEALED_BIT)
+        self._board = board
+        self._index = index
+
+    def reveal(self):
+        """Reveal the piece on its board square."""
+        self.revealed = True
+        code = self._board.squares[self._index]
+        if code:
+            self._board._set(self._index, code | REVEALED_BIT)
+
+
+class _GridRow:
+    """One row of the board, indexable like the old list of Piece objects."""
+
+    __slots__ = ('_board', '_offset')
+
+    def __init__(self, board, row):
+        self._board = board
+        self._offset = row * COLS
+
+    def __len__(self):
+        return COLS
+
+    def __getitem__(self, col):
+        if not 0 <= col < COLS:
+            raise IndexError(col)
+        index = self._offset + col
+        code = self._board.squares[index]
+        return _SquarePiece(self._board, index, code) if code else None
+
+    def __setitem__(self, col, piece):
+        if not 0 <= col < COLS:
+            raise IndexError(col)
+        code = encode_piece(piece.rank, piece.player, piece.revealed) if piece is not None else 0
+        self._board._set(self._offset + col, code)
+
+    def __iter__(self):
+        for col in range(COLS):
+            yield self[col]
+
+
+class _Grid:
+    """Read/write view of the packed squares as a 4x8 grid of Piece objects."""
+
+    __slots__ = ('_board',)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __len__(self):
+        return ROWS
+
+    def __getitem__(self, row):
+        if not 0 <= row < ROWS:
+            raise IndexError(row)
+        return _GridRow(self._board, row)
+
+    def __iter__(self):
+        for row in range(ROWS):
+            yield _GridRow(self._board, row)
+
+
 class Board:
-    def __init__(self):
-        """Initialize the board with a 4x8 grid."""
-        self.grid = [[None for _ in range(8)] for _ in range(4)]
-        self.initialize_pieces()
+    def __init__(self, squares=None, rng=None):
+        """
+        Initialize the board with a 4x8 grid.
 
-    def initialize_pieces(self):
-        """Randomly distribute the pieces on the board."""
+        Parameters:
+        squares (bytes): Optional encoded square values to start from (as in Board.squares);
+                         the pieces are shuffled randomly when omitted
+        rng (random.Random): Generator for the shuffle, None for the random module
+        """
+        self.squares = bytearray(NUM_SQUARES)
+        self.occupied = [0, 0, 0]  # Occupancy bitmask per player (index 0 unused)
+        self.unrevealed = 0  # Bitmask of face-down squares
+        self.hidden_counts = [0] * 16  # Face-down pieces per value (rank id and owner bit)
+        self.piece_counts = [0, 0, 0]  # Pieces on the board per player (index 0 unused)
+        self.unrevealed_count = 0
+        self.material = [0, 0, 0]  # Sum of RANK_VALUES per player, as returned by calculate_score
+        self.hash = 0  # Zobrist hash of the visible squares and hidden pool, updated on every change
+        self.pool_hash = 0  # The hidden pool's part of hash
+        self.state_key = 0  # Packed 128-bit state (see STATE_NIBBLES), updated on every change
+        if squares is None:
+            self.initialize_pieces(rng)
+        else:
+            for index, code in enumerate(squares):
+                self._set(index, code)
+
+    @property
+    def grid(self):
+        """The board as a 4x8 grid of Piece objects (None for empty squares)."""
+        return _Grid(self)
+
+    def copy(self):
+        """
+        Make an independent copy of the board.
+
+        Returns:
+        Board: The copied board
+        """
+        new_board = Board.__new__(Board)
+        new_board.squares = bytearray(self.squares)
+        new_board.occupied = list(self.occupied)
+        new_board.unrevealed = self.unrevealed
+        new_board.hidden_counts = list(self.hidden_counts)
+        new_board.piece_counts = list(self.piece_counts)
+        new_board.unrevealed_count = self.unrevealed_count
+        new_board.material = list(self.material)
+        new_board.hash = self.hash
+        new_board.pool_hash = self.pool_hash
+        new_board.state_key = self.state_key
+        return new_board
+
+    def _set(self, index, code):
+        """Write an encoded value to a square and keep the bitmasks, counters, hidden pool and hash in sync."""
+        old = self.squares[index]
+        bit = 1 << index
+        keys = ZOBRIST_KEYS[index]
+        self.hash ^= keys[old] ^ keys[code]
+        self.state_key ^= (STATE_NIBBLES[old] ^ STATE_NIBBLES[code]) << (4 * index)
+        if old:
+            player = 2 if old & OWNER_BIT else 1
+            self.occupied[player] &= ~bit
+            self.piece_counts[player] -= 1
+            self.material[player] -= _SCORE_VALUES[old & RANK_MASK]
+            if not old & REVEALED_BIT:
+                self.unrevealed &= ~bit
+                self.unrevealed_count -= 1
+                count = self.hidden_counts[old]
+                self.hidden_counts[old] = count - 1
+                pool_key = ZOBRIST_POOL_KEYS[old][count] ^ ZOBRIST_POOL_KEYS[old][count - 1]
+                self.pool_hash ^= pool_key
+                self.hash ^= pool_key
+        self.squares[index] = code
+        if code:
+            player = 2 if code & OWNER_BIT else 1
+            self.occupied[player] |= bit
+            self.piece_counts[player] += 1
+            self.material[player] += _SCORE_VALUES[code & RANK_MASK]
+            if not code & REVEALED_BIT:
+                self.unrevealed |= bit
+                self.unrevealed_count += 1
+                count = self.hidden_counts[code]
+                self.hidden_counts[code] = count + 1
+                pool_key = ZOBRIST_POOL_KEYS[code][count] ^ ZOBRIST_POOL_KEYS[code][count + 1]
+                self.pool_hash ^= pool_key
+                self.hash ^= pool_key
+
+    def initialize_pieces(self, rng=None):
+        """
+        Randomly distribute the pieces on the board.
+
+        Parameters:
+        rng (random.Random): Generator for the shuffle, None for the random module
+        """
         pieces = [
             ('K', 1), ('Q', 1), ('Q', 1), ('R', 1), ('R', 1), ('B', 1), ('B', 1), ('B', 1), ('N', 1), ('N', 1), ('N', 1), ('P', 1), ('P', 1), ('P', 1), ('P', 1), ('P', 1),
             ('K', 2), ('Q', 2), ('Q', 2), ('R', 2), ('R', 2), ('B', 2), ('B', 2), ('B', 2), ('N', 2), ('N', 2), ('N', 2), ('P', 2), ('P', 2), ('P', 2), ('P', 2), ('P', 2)
         ]
-        random.shuffle(pieces)
-        index = 0
-        for row in range(4):
-            for col in range(8):
-                rank, player = pieces[index]
-                self.grid[row][col] = Piece(rank, player)
-                index += 1
+        (rng or random).shuffle(pieces)
+        for index in range(NUM_SQUARES):
+            self._set(index, 0)
+        for index, (rank, player) in enumerate(pieces):
+            self._set(index, encode_piece(rank, player))
 
     def move_piece(self, from_pos, to_pos):
         """
@@ -49,8 +344,9 @@ class Board:
         to_pos (tuple): The ending position
         """
         if self.is_valid_move(from_pos, to_pos):
-            self.grid[to_pos[0]][to_pos[1]] = self.grid[from_pos[0]][from_pos[1]]
-            self.grid[from_pos[0]][from_pos[1]] = None
+            from_index = from_pos[0] * COLS + from_pos[1]
+            self._set(to_pos[0] * COLS + to_pos[1], self.squares[from_index])
+            self._set(from_index, 0)
 
     def capture_piece(self, from_pos, to_pos):
         """
@@ -60,15 +356,111 @@ class Board:
         from_pos (tuple): The starting position
         to_pos (tuple): The ending position
         """
-        from_piece = self.grid[from_pos[0]][from_pos[1]]
-        to_piece = self.grid[to_pos[0]][to_pos[1]]
         if self.is_valid_capture(from_pos, to_pos):
-            if from_piece.rank == to_piece.rank:
-                self.grid[from_pos[0]][from_pos[1]] = None
-                self.grid[to_pos[0]][to_pos[1]] = None
+            from_index = from_pos[0] * COLS + from_pos[1]
+            to_index = to_pos[0] * COLS + to_pos[1]
+            from_code = self.squares[from_index]
+            if (from_code ^ self.squares[to_index]) & RANK_MASK == 0:
+                self._set(to_index, 0)  # Equal ranks capture each other
             else:
-                self.grid[to_pos[0]][to_pos[1]] = from_piece
-                self.grid[from_pos[0]][from_pos[1]] = None
+                self._set(to_index, from_code)
+            self._set(from_index, 0)
+
+    def apply_move(self, from_pos, to_pos):
+        """
+        Play a move or capture in place without validating it.
+
+        Moving onto an empty square moves the piece, moving onto a piece of the
+        same rank removes both, otherwise the target piece is captured.
+
+        Parameters:
+        from_pos (tuple): The starting position
+        to_pos (tuple): The ending position
+
+        Returns:
+        tuple: An undo record to pass to undo()
+        """
+        from_index = from_pos[0] * COLS + from_pos[1]
+        to_index = to_pos[0] * COLS + to_pos[1]
+        from_code = self.squares[from_index]
+        to_code = self.squares[to_index]
+        if to_code and (from_code ^ to_code) & RANK_MASK == 0:
+            self._set(to_index, 0)
+        else:
+            self._set(to_index, from_code)
+        self._set(from_index, 0)
+        return (from_index, from_code, to_index, to_code)
+
+    def apply_reveal(self, pos):
+        """
+        Reveal the piece at a position in place.
+
+        Parameters:
+        pos (tuple): The position of the face-down piece
+
+        Returns:
+        tuple: An undo record to pass to undo()
+        """
+        index = pos[0] * COLS + pos[1]
+        code = self.squares[index]
+        self._set(index, code | REVEALED_BIT)
+        return (index, code)
+
+    def apply_reveal_as(self, pos, code):
+        """
+        Reveal the face-down piece at a position as a given hidden piece.
+
+        Used by the search to play out one outcome of a reveal without looking
+        at which piece is really there. If the square holds a different piece,
+        it first swaps identities with a face-down square holding the wanted
+        one, which leaves everything the players can see unchanged.
+
+        Parameters:
+        pos (tuple): The position of the face-down piece
+        code (int): The encoded face-down piece to reveal, as listed by hidden_pool()
+
+        Returns:
+        tuple: An undo record to pass to undo()
+        """
+        index = pos[0] * COLS + pos[1]
+        current = self.squares[index]
+        if current == code:
+            self._set(index, code | REVEALED_BIT)
+            return (index, current)
+        squares = self.squares
+        mask = self.unrevealed
+        while mask:
+            low = mask & -mask
+            other = low.bit_length() - 1
+            if squares[other] == code:
+                break
+            mask ^= low
+        else:
+            raise ValueError(f"no face-down piece with value {code}")
+        self._set(other, current)
+        self._set(index, code | REVEALED_BIT)
+        return (other, code, index, current)
+
+    def hidden_pool(self):
+        """
+        Get the face-down pieces that a reveal could turn up.
+
+        Returns:
+        list: (code, count) pairs for every face-down piece value still hidden
+        """
+        return [(code, count) for code, count in enumerate(self.hidden_counts) if count]
+
+    def undo(self, record):
+        """
+        Take back a change made by apply_move, apply_reveal or apply_reveal_as.
+
+        Records must be undone in the reverse order they were applied.
+
+        Parameters:
+        record (tuple): The undo record returned when the change was applied
+        """
+        for i in range(len(record) - 2, -1, -2):
+            self._set(record[i], record[i + 1])
 
     def is_valid_move(self, from_pos, to_pos):
         """
@@ -81,13 +473,11 @@ class Board:
         Returns:
         bool: Whether the move is valid
         """
-        if self.grid[from_pos[0]][from_pos[1]] is None:
+        if not self.squares[from_pos[0] * COLS + from_pos[1]]:
             return False
-        if self.grid[to_pos[0]][to_pos[1]] is not None:
+        if self.squares[to_pos[0] * COLS + to_pos[1]]:
             return False
-        row_diff = abs(from_pos[0] - to_pos[0])
-        col_diff = abs(from_pos[1] - to_pos[1])
-        return (row_diff == 1 and col_diff == 0) or (row_diff == 0 and col_diff == 1)
+        return abs(from_pos[0] - to_pos[0]) + abs(from_pos[1] - to_pos[1]) == 1
 
     def is_valid_capture(self, from_pos, to_pos):
         """
@@ -100,34 +490,17 @@ class Board:
         Returns:
         bool: Whether the capture is valid
         """
-        if self.grid[from_pos[0]][from_pos[1]] is None or self.grid[to_pos[0]][to_pos[1]] is None:
+        from_code = self.squares[from_pos[0] * COLS + from_pos[1]]
+        to_code = self.squares[to_pos[0] * COLS + to_pos[1]]
+        if not from_code or not to_code:
             return False
-        from_piece = self.grid[from_pos[0]][from_pos[1]]
-        to_piece = self.grid[to_pos[0]][to_pos[1]]
-        if not to_piece.revealed:  # Ensure the target piece is revealed
+        if not to_code & REVEALED_BIT:  # Ensure the target piece is revealed
             return False
-        if from_piece.player == to_piece.player:
+        if (from_code ^ to_code) & OWNER_BIT == 0:
             return False
-        row_diff = abs(from_pos[0] - to_pos[0])
-        col_diff = abs(from_pos[1] - to_pos[1])
-        if not ((row_diff == 1 and col_diff == 0) or (row_diff == 0 and col_diff == 1)):
+        if abs(from_pos[0] - to_pos[0]) + abs(from_pos[1] - to_pos[1]) != 1:
             return False
-        rank_order = {'K': 6, 'Q': 5, 'R': 4, 'B': 3, 'N': 2, 'P': 1}
-        if from_piece.rank == 'K' and to_piece.rank == 'P':
-            return False  # King cannot capture Pawn
-        if from_piece.rank == 'K':
-            return rank_order[to_piece.rank] < 7  # King can capture anything except Pawns
-        elif from_piece.rank == 'Q':
-            return rank_order[to_piece.rank] < 6  # Queen can capture anything except Kings
-        elif from_piece.rank == 'R':
-            return rank_order[to_piece.rank] < 5  # Rook can capture anything except Kings and Queens
-        elif from_piece.rank == 'B':
-            return rank_order[to_piece.rank] < 4  # Bishop can capture anything except Kings, Queens, and Rooks
-        elif from_piece.rank == 'N':
-            return rank_order[to_piece.rank] < 3  # Knight can capture anything except Kings, Queens, Rooks, and Bishops
-        elif from_piece.rank == 'P':
-            return to_piece.rank == 'K' or to_piece.rank == 'P'  # Pawn can only capture Kings and other Pawns
-        return False
+        return CAN_CAPTURE[from_code & RANK_MASK][to_code & RANK_MASK]
 
     def all_pieces_revealed(self):
         """
@@ -136,11 +509,7 @@ class Board:
         Returns:
         bool: True if all pieces are revealed, False otherwise.
         """
-        for row in self.grid:
-            for piece in row:
-                if piece and not piece.revealed:
-                    return False
-        return True
+        return self.unrevealed_count == 0
 
     def get_state(self):
         """
@@ -149,7 +518,84 @@ class Board:
         Returns:
         tuple: A tuple representation of the board state
         """
-        return tuple(tuple((piece.rank, piece.player, piece.revealed) if piece else None for piece in row) for row in self.grid)
+        cells = _STATE_CELLS
+        squares = self.squares
+        return tuple(tuple(cells[code] for code in squares[start:start + COLS]) for start in range(0, NUM_SQUARES, COLS))
+
+    def get_state_key(self):
+        """
+        Get the current state packed into one integer (4 bits per square).
+
+        Returns:
+        int: The packed state, see state_encoding for encoding and decoding
+        """
+        return self.state_key
+
+    def unrevealed_positions(self):
+        """
+        Get the positions of all face-down pieces.
+
+        Returns:
+        list: A list of (row, col) positions
+        """
+        mask = self.unrevealed
+        return [POSITIONS[index] for index in range(NUM_SQUARES) if mask >> index & 1]
+
+    def legal_actions(self, player):
+        """
+        Generate every move and capture available to a player's revealed pieces.
+
+        Parameters:
+        player (int): The player number (1 or 2)
+
+        Yields:
+        tuple: A valid move (from_pos, to_pos)
+        """
+        squares = self.squares
+        mask = self.occupied[player] & ~self.unrevealed
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            index = low.bit_length() - 1
+            can_enter = _CAN_ENTER[squares[index]]
+            for neighbor in ADJACENT[index]:
+                if can_enter[squares[neighbor]]:
+                    yield POSITIONS[index], POSITIONS[neighbor]
+
+    def valid_moves(self, player):
+        """
+        Get every move and capture available to a player's revealed pieces.
+
+        Parameters:
+        player (int): The player number (1 or 2)
+
+        Returns:
+        list: A list of valid moves (from_pos, to_pos)
+        """
+        return list(self.legal_actions(player))
+
+    def _has_moves(self, player):
+        """
+        Check whether a player has any move or capture available.
+
+        A plain move into an empty square is found with a few bit operations;
+        captures are only checked piece by piece when there is none.
+        """
+        own = self.occupied[player]
+        if neighbor_mask(own) & ~(self.occupied[1] | self.occupied[2]):
+            return True
+        targets = self.occupied[3 - player] & ~self.unrevealed
+        attackers = own & neighbor_mask(targets)
+        squares = self.squares
+        while attackers:
+            low = attackers & -attackers
+            attackers ^= low
+            index = low.bit_length() - 1
+            can_enter = _CAN_ENTER[squares[index]]
+            for neighbor in ADJACENT[index]:
+                if can_enter[squares[neighbor]]:
+                    return True
+        return False
 
     def check_winner(self, step_count):
         """
@@ -161,49 +607,20 @@ class Board:
         Returns:
         int: The player who won, or 0 for a draw, or None if no winner yet
         """
-        if not self.all_pieces_revealed():
+        if self.unrevealed_count:
             return None  # Do not check winner if all pieces are not revealed
 
-        player1_pieces = 0
-        player2_pieces = 0
-        player1_has_moves = False
-        player2_has_moves = False
-        for row in range(4):
-            for col in range(8):
-                piece = self.grid[row][col]
-                if piece is not None:
-                    if piece.player == 1:
-                        player1_pieces += 1
-                        if any(self.is_valid_move((row, col), (row + dr, col + dc)) for dr in (-1, 1) for dc in (0, 0) if 0 <= row + dr < 4 and 0 <= col + dc < 8):
-                            player1_has_moves = True
-                        if any(self.is_valid_move((row, col), (row, col + dc)) for dr in (0, 0) for dc in (-1, 1) if 0 <= row < 4 and 0 <= col + dc < 8):
-                            player1_has_moves = True
-                        if any(self.is_valid_capture((row, col), (row + dr, col + dc)) for dr in (-1, 1) for dc in (0, 0) if 0 <= row + dr < 4 and 0 <= col + dc < 8):
-                            player1_has_moves = True
-                        if any(self.is_valid_capture((row, col), (row, col + dc)) for dr in (0, 0) for dc in (-1, 1) if 0 <= row < 4 and 0 <= col + dc < 8):
-                            player1_has_moves = True
-                    elif piece.player == 2:
-                        player2_pieces += 1
-                        if any(self.is_valid_move((row, col), (row + dr, col + dc)) for dr in (-1, 1) for dc in (0, 0) if 0 <= row + dr < 4 and 0 <= col + dc < 8):
-                            player2_has_moves = True
-                        if any(self.is_valid_move((row, col), (row, col + dc)) for dr in (0, 0) for dc in (-1, 1) if 0 <= row < 4 and 0 <= col + dc < 8):
-                            player2_has_moves = True
-                        if any(self.is_valid_capture((row, col), (row + dr, col + dc)) for dr in (-1, 1) for dc in (0, 0) if 0 <= row + dr < 4 and 0 <= col + dc < 8):
-                            player2_has_moves = True
-                        if any(self.is_valid_capture((row, col), (row, col + dc)) for dr in (0, 0) for dc in (-1, 1) if 0 <= row < 4 and 0 <= col + dc < 8):
-                            player2_has_moves = True
-
-        if player1_pieces == 0:
+        if not self.piece_counts[1]:
             return 2  # Player 2 wins
-        elif player2_pieces == 0:
+        elif not self.piece_counts[2]:
             return 1  # Player 1 wins
-        elif not player1_has_moves:
+        elif not self._has_moves(1):
             return 2  # Player 2 wins if Player 1 has no moves
-        elif not player2_has_moves:
+        elif not self._has_moves(2):
             return 1  # Player 1 wins if Player 2 has no moves
-        elif step_count >= 150:
-            player1_score = self.calculate_score(1)
-            player2_score = self.calculate_score(2)
+        elif step_count >= SCORE_STEP_LIMIT:
+            player1_score = self.material[1]
+            player2_score = self.material[2]
             if player1_score > player2_score:
                 return 1
             elif player2_score > player1_score:
@@ -223,10 +640,4 @@ class Board:
         Returns:
         int: The calculated score
         """
-        score = 0
-        rank_values = {'K': 10, 'Q': 7, 'R': 5, 'B': 4, 'N': 2.5, 'P': 1}
-        for row in self.grid:
-            for piece in row:
-                if piece and piece.player == player:
-                    score += rank_values[piece.rank]
-        return score
+        return self.material[player]
@@ -3,61 +3,17 @@
 
 import pygame
 import sys
+import threading
+from concurrent.futures import Future
+from assets import load_piece_images
 from board import Board
 from qlearning_agent import QLearningAgent
 from minmax_agent import MinMaxAgent
+from ponder import Ponderer
+from renderer import BoardRenderer
 
 # Define colors
-WHITE, BLACK, BLUE, RED, LIGHT_BLUE = (255, 255, 255), (0, 0, 0), (0, 0, 255), (255, 0, 0), (173, 216, 230)
-
-# Load piece images (example)
-PIECE_IMAGES = {
-    'K_black': pygame.transform.scale(pygame.image.load('../images/king_black.png'), (100, 100)),
-    'K_white': pygame.transform.scale(pygame.image.load('../images/king_white.png'), (100, 100)),
-    'Q_black': pygame.transform.scale(pygame.image.load('../images/queen_black.png'), (100, 100)),
-    'Q_white': pygame.transform.scale(pygame.image.load('../images/queen_white.png'), (100, 100)),
-    'R_black': pygame.transform.scale(pygame.image.load('../images/rook_black.png'), (100, 100)),
-    'R_white': pygame.transform.scale(pygame.image.load('../images/rook_white.png'), (100, 100)),
-    'B_black': pygame.transform.scale(pygame.image.load('../images/bishop_black.png'), (100, 100)),
-    'B_white': pygame.transform.scale(pygame.image.load('../images/bishop_white.png'), (100, 100)),
-    'N_black': pygame.transform.scale(pygame.image.load('../images/knight_black.png'), (100, 100)),
-    'N_white': pygame.transform.scale(pygame.image.load('../images/knight_white.png'), (100, 100)),
-    'P_black': pygame.transform.scale(pygame.image.load('../images/pawn_black.png'), (100, 100)),
-    'P_white': pygame.transform.scale(pygame.image.load('../images/pawn_white.png'), (100, 100)),
-}
-
-def draw_board(win, board):
-    """
-    Draw the game board.
-
-    Parameters:
-    win (pygame.Surface): The game window.
-    board (Board): The game board.
-    """
-    win.fill(WHITE)
-    for row in range(4):
-        for col in range(8):
-            color = LIGHT_BLUE if board.grid[row][col] is not None and not board.grid[row][col].revealed else (BLUE if (row + col) % 2 == 0 else RED)
-            pygame.draw.rect(win, color, (col * 100, row * 100, 100, 100))
-            pygame.draw.rect(win, BLACK, (col * 100, row * 100, 100, 100), 1)
-
-def draw_pieces(win, board):
-    """
-    Draw the pieces on the board.
-
-    Parameters:
-    win (pygame.Surface): The game window.
-    board (Board): The game board.
-    """
-    for row in range(4):
-        for col in range(8):
-            piece = board.grid[row][col]
-            if piece is not None and piece.revealed:
-                image_key = f"{piece.rank}_{'black' if piece.player == 1 else 'white'}"
-                if image_key in PIECE_IMAGES:
-                    win.blit(PIECE_IMAGES[image_key], (col * 100, row * 100))
-                else:
-                    print(f"Image for {image_key} not found in PIECE_IMAGES dictionary")
+BLACK, RED = (0, 0, 0), (255, 0, 0)
 
 def get_square_under_mouse():
     """
@@ -72,32 +28,71 @@ def get_square_under_mouse():
         return (y, x)
     return None
 
-def display_message(win, message):
+def display_message(renderer, message):
     """
     Display a message in the game window.
 
     Parameters:
-    win (pygame.Surface): The game window.
+    renderer (BoardRenderer): The renderer of the game window.
     message (str): The message to display.
     """
-    font = pygame.font.Font(None, 36)
-    text = font.render(message, True, RED)
-    text_rect = text.get_rect(center=(400, 200))
-    win.blit(text, text_rect)
-    pygame.display.update()
+    renderer.show_message(message, 36, RED)
     pygame.time.delay(2000)
 
-def draw_last_action(win, last_action):
+def last_action_text(last_action):
     """
-    Draw the last action taken by the AI.
+    Get the text showing the last action taken by the AI.
 
     Parameters:
-    win (pygame.Surface): The game window.
     last_action (str): The last action taken by the AI.
+
+    Returns:
+    tuple: The text as (message, size, color, topleft) for BoardRenderer.render
     """
-    font = pygame.font.Font(None, 24)
-    text = font.render(f"AI's last action: {last_action}", True, BLACK)
-    win.blit(text, (10, 370))
+    return (f"AI's last action: {last_action}", 24, BLACK, (10, 370))
+
+def thinking_text(frame):
+    """
+    Get the indicator shown while the AI is thinking.
+
+    Parameters:
+    frame (int): Frames drawn so far, used to animate the dots.
+
+    Returns:
+    tuple: The text as (message, size, color, topleft) for BoardRenderer.render
+    """
+    return ("AI is thinking" + "." * (frame // 20 % 4), 24, BLACK, (600, 370))
+
+def start_ai_turn(ai_agent, ai_type, board, step_count):
+    """
+    Choose the AI's action on a background thread.
+
+    The AI searches a copy of the board, so the window can keep drawing the
+    real one. The thread is a daemon, so it never keeps the program alive.
+
+    Parameters:
+    ai_agent (QLearningAgent or MinMaxAgent): The AI agent.
+    ai_type (str): The type of AI ('qlearning' or 'minmax').
+    board (Board): The game board.
+    step_count (int): The current step count.
+
+    Returns:
+    Future: Completes with the chosen action.
+    """
+    future = Future()
+    board = board.copy()
+
+    def think():
+        try:
+            if ai_type == 'qlearning':
+                future.set_result(ai_agent.choose_action(ai_agent.get_state(board), board))
+            else:
+                future.set_result(ai_agent.choose_action(board, step_count))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=think, daemon=True).start()
+    return future
 
 def play_game(win, ai_type):
     """
@@ -112,7 +107,9 @@ def play_game(win, ai_type):
         ai_agent = QLearningAgent(actions=['flip', 'move'], player=2)
         ai_agent.load_q_table('ai_agent_1_q_table.pkl')
     elif ai_type == 'minmax':
-        ai_agent = MinMaxAgent(depth=3, player=2)
+        ai_agent = MinMaxAgent(player=2, tt_capacity=1 << 16, time_limit_ms=500)
+    ponderer = Ponderer(ai_agent) if ai_type == 'minmax' else None
+    renderer = BoardRenderer(win, load_piece_images(100))
 
     clock = pygame.time.Clock()
     selected_piece = None
@@ -121,11 +118,20 @@ def play_game(win, ai_type):
     player_color = 1
     step_count = 0
     last_action = "None"
+    ai_future = None
+    frame = 0
 
     while run:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
+                if ponderer is not None:
+                    ponderer.stop()
+                if ai_future is not None and ai_type == 'minmax':
+                    ai_agent.cancel()
+
+            if event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 pos = get_square_under_mouse()
@@ -140,24 +146,31 @@ def play_game(win, ai_type):
                         selected_piece = (row, col)
                     elif selected_piece:
                         to_pos = pos
-                        if board.is_valid_move(selected_piece, to_pos):
-                            board.move_piece(selected_piece, to_pos)
-                            player_turn = False
-                            selected_piece = None
-                            step_count += 1
-                        elif board.is_valid_capture(selected_piece, to_pos):
-                            board.capture_piece(selected_piece, to_pos)
+                        if (selected_piece, to_pos) in board.legal_actions(player_color):
+                            board.apply_move(selected_piece, to_pos)
                             player_turn = False
                             selected_piece = None
                             step_count += 1
                         else:
-                            display_message(win, "Invalid move!")
+                            display_message(renderer, "Invalid move!")
                             selected_piece = None
 
-        if not player_turn:
-            state = ai_agent.get_state(board) if ai_type == 'qlearning' else None
-            action = ai_agent.choose_action(board, step_count) if ai_type == 'minmax' else ai_agent.choose_action(state, board)
+        if not player_turn and run and ai_future is None:
+            pondered_action = None
+            if ponderer is not None:
+                ponderer.stop()
+                pondered_action = ponderer.lookup(board, step_count)
+            if pondered_action is not None:
+                ai_future = Future()
+                ai_future.set_result(pondered_action)
+            else:
+                ai_future = start_ai_turn(ai_agent, ai_type, board, step_count)
+
+        if ai_future is not None and ai_future.done() and run:
+            action = ai_future.result()
+            ai_future = None
             if ai_type == 'qlearning':
+                state = ai_agent.get_state(board)
                 next_state, reward, done, action_detail = ai_agent.step(state, action, board, step_count)
             else:
                 if action[0] == 'reveal':
@@ -166,30 +179,32 @@ def play_game(win, ai_type):
                     action_detail = f"flip piece at {pos}"
                 else:
                     from_pos, to_pos = action
-                    if board.is_valid_move(from_pos, to_pos):
-                        board.move_piece(from_pos, to_pos)
-                    elif board.is_valid_capture(from_pos, to_pos):
-                        board.capture_piece(from_pos, to_pos)
+                    board.apply_move(from_pos, to_pos)
                     action_detail = f"moved piece from {from_pos} to {to_pos}"
             last_action = action_detail
             player_turn = True
             step_count += 1
+            if ponderer is not None and board.check_winner(step_count) is None:
+                ponderer.start(board, step_count + 1)
 
-        draw_board(win, board)
-        draw_pieces(win, board)
-        draw_last_action(win, last_action)
-        pygame.display.update()
+        texts = [last_action_text(last_action)]
+        if ai_future is not None:
+            texts.append(thinking_text(frame))
+        renderer.render(board, texts)
         clock.tick(60)
+        frame += 1
 
         winner = board.check_winner(step_count)
         if winner is not None:
             if winner == 1:
-                display_message(win, "Player 1 wins!")
+                display_message(renderer, "Player 1 wins!")
             elif winner == 2:
-                display_message(win, "Player 2 wins!")
+                display_message(renderer, "Player 2 wins!")
             else:
-                display_message(win, "Draw!")
+                display_message(renderer, "Draw!")
             run = False
 
+    if ai_type == 'minmax':
+        ai_agent.close()
     pygame.quit()
     sys.exit()
@@ -0,0 +1,230 @@
+# linear_agent.py
+# Author: Henry Shi
+
+import numpy as np
+from board import ADJACENT, CAN_CAPTURE, NUM_SQUARES, OWNER_BIT, RANK_MASK, RANK_VALUES, RANKS, REVEALED_BIT
+from qlearning_agent import QLearningAgent
+
+# Pieces of each rank id a player starts with, used to scale the counts
+_START_COUNTS = (0, 5, 3, 3, 2, 2, 1)
+_NUM_RANKS = len(RANKS) - 1
+_VALUES = tuple(RANK_VALUES[rank] if rank else 0 for rank in RANKS)
+_TOTAL_MATERIAL = sum(count * value for count, value in zip(_START_COUNTS, _VALUES))
+
+# Feature layout; "own" and "opponent" are relative to the agent's player
+REVEALED_OFFSET = 0  # Revealed pieces per rank, own then opponent
+HIDDEN_OFFSET = REVEALED_OFFSET + 2 * _NUM_RANKS  # Face-down pieces per rank, own then opponent
+MOBILITY_OFFSET = HIDDEN_OFFSET + 2 * _NUM_RANKS  # Legal moves, own then opponent
+THREATENED_OFFSET = MOBILITY_OFFSET + 2  # Pieces that can be captured, own then opponent
+THREATENED_MATERIAL_OFFSET = THREATENED_OFFSET + 2  # Their material, own then opponent
+BIAS_INDEX = THREATENED_MATERIAL_OFFSET + 2
+NUM_FEATURES = BIAS_INDEX + 1
+
+def extract_features(board, player):
+    """
+    Describe a board from one player's side as a feature vector.
+
+    Parameters:
+    board (Board): The board object
+    player (int): The player the features are relative to
+
+    Returns:
+    np.ndarray: NUM_FEATURES values, each roughly between 0 and 1
+    """
+    features = np.zeros(NUM_FEATURES)
+    own_bit = OWNER_BIT if player == 2 else 0
+    squares = board.squares
+    threatened = [0, 0]
+    threatened_material = [0.0, 0.0]
+    for index in range(NUM_SQUARES):
+        code = squares[index]
+        if not code & REVEALED_BIT:
+            continue
+        rank = code & RANK_MASK
+        side = 0 if code & OWNER_BIT == own_bit else 1
+        features[REVEALED_OFFSET + side * _NUM_RANKS + rank - 1] += 1 / _START_COUNTS[rank]
+        for neighbor in ADJACENT[index]:
+            attacker = squares[neighbor]
+            if attacker & REVEALED_BIT and (attacker ^ code) & OWNER_BIT and CAN_CAPTURE[attacker & RANK_MASK][rank]:
+                threatened[side] += 1
+                threatened_material[side] += _VALUES[rank]
+                break
+    for hidden_code, count in enumerate(board.hidden_counts):
+        if count:
+            rank = hidden_code & RANK_MASK
+            side = 0 if hidden_code & OWNER_BIT == own_bit else 1
+            features[HIDDEN_OFFSET + side * _NUM_RANKS + rank - 1] = count / _START_COUNTS[rank]
+    for side, side_player in enumerate((player, 3 - player)):
+        features[MOBILITY_OFFSET + side] = sum(1 for _ in board.legal_actions(side_player)) / NUM_SQUARES
+        features[THREATENED_OFFSET + side] = threatened[side] / 16
+        features[THREATENED_MATERIAL_OFFSET + side] = threatened_material[side] / _TOTAL_MATERIAL
+    features[BIAS_INDEX] = 1.0
+    return features
+
+class LinearAgent(QLearningAgent):
+
+
+    def __init__(self, alpha=0.01, gamma=0.8, epsilon=0.1, actions=None, player=1, batch_size=32):
+        """
+        Initialize an agent that scores actions with a linear function of board features.
+
+        It plays through the same interface as QLearningAgent, but the state
+        is a feature vector (see extract_features) and Q(state, action) is the
+        dot product of the state with that action's weights, so boards never
+        seen before still get a useful value.
+
+        Parameters:
+        alpha (float): Learning rate
+        gamma (float): Discount factor
+        epsilon (float): Exploration rate
+        actions (list): The available actions, defaults to ['flip', 'move']
+        player (int): The player number (1 or 2)
+        batch_size (int): Transitions collected before each TD update
+        """
+        super().__init__(alpha, gamma, epsilon, actions if actions is not None else ['flip', 'move'], player)
+        self.q_table = None
+        self.weights = np.zeros((len(self.actions), NUM_FEATURES))
+        self.batch_size = batch_size
+        self.pending = []  # Transitions waiting for the next batch update
+
+    def get_state(self, board):
+        """
+        Get the state of the board.
+
+        Parameters:
+        board (Board): The board object
+
+        Returns:
+        np.ndarray: The board's features from this agent's side
+        """
+        return extract_features(board, self.player)
+
+    def q_values(self, state):
+        """
+        Get the value of every action in a state.
+
+        Parameters:
+        state (np.ndarray): The state features
+
+        Returns:
+        np.ndarray: One value per action, in the order of self.actions
+        """
+        return self.weights @ state
+
+    def choose_action(self, state, board):
+        """
+        Choose the best action based on the current state and epsilon-greedy policy.
+
+        Parameters:
+        state (np.ndarray): The current state
+        board (Board): The board object
+
+        Returns:
+        str: The chosen action
+        """
+        valid_actions = self.actions if board.unrevealed else ['move']
+
+        if np.random.rand() < self.epsilon:
+            return np.random.choice(valid_actions)
+        q_values = self.q_values(state)
+        return max(valid_actions, key=lambda action: q_values[self.actions.index(action)])
+
+    def update_q_table(self, state, action, reward, next_state):
+        """
+        Queue a transition, and update the weights once a batch is full.
+
+        Parameters:
+        state (np.ndarray): The current state
+        action (str): The action taken
+        reward (int): The received reward
+        next_state (np.ndarray): The next state
+        """
+        self.pending.append((state, action, reward, next_state))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Update the weights from the transitions queued since the last batch."""
+        if self.pending:
+            self.update_q_table_from_experience(self.pending)
+            self.pending = []
+
+    def remember(self, state, action, reward, next_state, done):
+        """
+        Add a transition to the replay buffer, if the agent has one.
+
+        Parameters:
+        state (np.ndarray): The current state features
+        action (str): The action taken
+        reward (int): The received reward
+        next_state (np.ndarray): The next state features
+        done (bool): Whether the game ended
+        """
+        buffer = self.replay_buffer
+        if buffer is None:
+            return
+        if buffer.num_features != NUM_FEATURES:
+            raise ValueError(f"LinearAgent needs a ReplayBuffer made with num_features={NUM_FEATURES}")
+        buffer.add(state, action, reward, next_state, done)
+
+    def table_size(self):
+        """
+        Get the number of learned values, for progress reports.
+
+        Returns:
+        int: The number of weights
+        """
+        return self.weights.size
+
+    def update_q_table_from_experience(self, experiences, weights=None):
+        """
+        Update the weights with one batched TD step.
+
+        Each action's weights move by the mean of TD error times features over
+        the experiences that took it. An experience that ended the game has no
+        future reward.
+
+        Parameters:
+        experiences (list): A list of experiences (state, action, reward, next state),
+                            optionally followed by a done flag
+        weights (np.ndarray): Scale of each experience's update, None for all 1
+
+        Returns:
+        np.ndarray: The TD error of each experience
+        """
+        states = np.array([experience[0] for experience in experiences])
+        next_states = np.array([experience[3] for experience in experiences])
+        action_ids = np.array([self.actions.index(experience[1]) for experience in experiences])
+        rewards = np.array([experience[2] for experience in experiences], dtype=np.float64)
+        dones = np.array([len(experience) > 4 and bool(experience[4]) for experience in experiences])
+
+        q_values = np.einsum('ij,ij->i', states, self.weights[action_ids])
+        next_max = np.where(dones, 0.0, (next_states @ self.weights.T).max(axis=1))
+        td_errors = rewards + self.gamma * next_max - q_values
+        scaled = td_errors if weights is None else td_errors * weights
+        gradient = np.zeros_like(self.weights)
+        np.add.at(gradient, action_ids, scaled[:, None] * states)
+        counts = np.bincount(action_ids, minlength=len(self.actions))
+        self.weights += self.alpha * gradient / np.maximum(counts, 1)[:, None]
+        return td_errors
+
+    def save_q_table(self, filename):
+        """
+        Save the weights to a file, after applying any queued transitions.
+
+        Parameters:
+        filename (str): The name of the file to save the weights
+        """
+        self.flush()
+        with open(filename, 'wb') as f:
+            np.save(f, self.weights)
+
+    def load_q_table(self, filename):
+        """
+        Load the weights from a file.
+
+        Parameters:
+        filename (str): The name of the file to load the weights from
+        """
+        with open(filename, 'rb') as f:
+            self.weights = np.load(f)
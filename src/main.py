@@ -5,22 +5,21 @@ import pygame
 import sys
 from game import play_game
 
-# Initialize Pygame
-pygame.init()
-
 WIDTH, HEIGHT = 800, 400
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Flip Chess')
 
 def main():
     """
     Main function to choose AI type and start the game.
     """
+    pygame.init()
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Flip Chess')
+
     run = True
     selected_ai = None
 
     while run:
-        WIN.fill((255, 255, 255))
+        win.fill((255, 255, 255))
 
         font = pygame.font.Font(None, 36)
         qlearning_text = font.render("Play against Q-Learning AI", True, (0, 0, 0))
@@ -29,8 +28,8 @@ def main():
         qlearning_rect = qlearning_text.get_rect(center=(WIDTH // 2, HEIGHT // 3))
         minmax_rect = minmax_text.get_rect(center=(WIDTH // 2, 2 * HEIGHT // 3))
 
-        WIN.blit(qlearning_text, qlearning_rect)
-        WIN.blit(minmax_text, minmax_rect)
+        win.blit(qlearning_text, qlearning_rect)
+        win.blit(minmax_text, minmax_rect)
 
         pygame.display.update()
 
@@ -48,7 +47,7 @@ def main():
                     selected_ai = 'minmax'
                     run = False
 
-    play_game(WIN, selected_ai)
+    play_game(win, selected_ai)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,54 @@
+# metrics.py
+# Author: Henry Shi
+
+import json
+import time
+
+class NullMetrics:
+    """Metrics sink that drops everything; the default wherever metrics are optional."""
+
+    enabled = False
+
+    def emit(self, event, **fields):
+        pass
+
+    def close(self):
+        pass
+
+# Shared instance used when no metrics object is given
+NULL_METRICS = NullMetrics()
+
+class JsonlMetrics:
+    enabled = True
+
+    def __init__(self, destination):
+        """
+        Initialize a metrics sink writing one JSON object per line.
+
+        Parameters:
+        destination (str or file): A file name to append to, or an open text file
+        """
+        if isinstance(destination, str):
+            self.file = open(destination, 'a')
+            self.owns_file = True
+        else:
+            self.file = destination
+            self.owns_file = False
+
+    def emit(self, event, **fields):
+        """
+        Write one record.
+
+        Parameters:
+        event (str): The kind of record, such as 'search' or 'episode'
+        fields: The values to record; they must be JSON-serializable
+        """
+        record = {'event': event, 'time': time.time()}
+        record.update(fields)
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        """Close the file if this object opened it."""
+        if self.owns_file:
+            self.file.close()
@@ -1,12 +1,66 @@
 # minmax_agent.py
 # Author: Henry Shi
 
-import copy
+import random
+import time
+from board import COLS, RANK_MASK, RANK_VALUES, RANKS, SCORE_STEP_LIMIT, ZOBRIST_SIDE
+from metrics import NULL_METRICS
+from parallel_search import RootParallelSearch
+from symmetry import IDENTITY, canonicalize, map_action
+from transposition_table import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+# Material value of each encoded rank id, used to order captures
+CAPTURE_VALUES = tuple(RANK_VALUES[rank] if rank else 0 for rank in RANKS) + (0,)
+
+# Deepest iteration tried by the time-budgeted search
+MAX_SEARCH_DEPTH = 64
+
+# Score of a won game; no evaluation reaches it, which bounds chance node values
+WIN_SCORE = 80
 
 class MinMaxAgent:
-    def __init__(self, depth=3, player=1):
+    def __init__(self, depth=3, player=1, alpha_beta=False, tt_capacity=0, time_limit_ms=None, reveal_samples=None, seed=None, symmetric_tt=False, metrics=None, workers=None):
+        """
+        Initialize the agent.
+
+        Parameters:
+        depth (int): The search depth in plies, ignored when time_limit_ms is set
+        player (int): The player the agent plays for (1 or 2)
+        alpha_beta (bool): Search with alpha-beta pruning and move ordering
+        tt_capacity (int): Slots in the transposition table used by the alpha-beta search, 0 to disable
+        time_limit_ms (int): Think for this many milliseconds per move using iterative
+                             deepening with alpha-beta, instead of searching to a fixed depth
+        reveal_samples (int): Search at most this many sampled outcomes per reveal, None for all
+        seed (int): Seed for sampling reveal outcomes
+        symmetric_tt (bool): Share transposition table entries between mirror images of a position
+        metrics (JsonlMetrics): Where to record statistics of every search, None for nowhere
+        workers (int): Search the root actions on this many processes (always with
+                       alpha-beta), None to search in this process
+        """
         self.depth = depth
         self.player = player
+        self.alpha_beta = alpha_beta
+        self.transposition_table = TranspositionTable(tt_capacity) if tt_capacity else None
+        self.symmetric_tt = symmetric_tt
+        self.time_limit_ms = time_limit_ms
+        self.reveal_samples = reveal_samples
+        self.rng = random.Random(seed)
+        self.killers = []
+        self.history = {}
+        self.pv_move = None  # Best root move of the last completed iteration
+        self.completed_depth = 0
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+        self.cancelled = False  # Set by cancel() from another thread to abandon the search
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.ply_nodes = None  # Nodes visited per ply, only counted when metrics are enabled
+        self.move_nodes = 0  # Nodes that tried moves
+        self.reveal_nodes = 0  # Nodes that tried reveals (chance nodes)
+        self.parallel = RootParallelSearch(workers, {
+            'depth': depth, 'player': player, 'tt_capacity': tt_capacity,
+            'reveal_samples': reveal_samples, 'seed': seed, 'symmetric_tt': symmetric_tt,
+        }) if workers else None
 
     def evaluate_board(self, board):
         """
@@ -18,19 +72,7 @@ class MinMaxAgent:
         Returns:
         int: The evaluation score
         """
-        rank_values = {'K': 10, 'Q': 7, 'R': 5, 'B': 4, 'N': 2.5, 'P': 1}
-        player_score = 0
-        opponent_score = 0
-    
-        for row in board.grid:
-            for piece in row:
-                if piece:
-                    if piece.player == self.player:
-                        player_score += rank_values[piece.rank]
-                    else:
-                        opponent_score += rank_values[piece.rank]
-                    
-        return player_score - opponent_score
+        return board.calculate_score(self.player) - board.calculate_score(3 - self.player)
 
 
     def get_all_valid_moves(self, board, player):
@@ -44,17 +86,7 @@ class MinMaxAgent:
         Returns:
         list: A list of valid moves (from_pos, to_pos)
         """
-        valid_moves = []
-        for row in range(4):
-            for col in range(8):
-                piece = board.grid[row][col]
-                if piece and piece.player == player and piece.revealed:
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        to_pos = (row + dr, col + dc)
-                        if 0 <= to_pos[0] < 4 and 0 <= to_pos[1] < 8:
-                            if board.is_valid_move((row, col), to_pos) or board.is_valid_capture((row, col), to_pos):
-                                valid_moves.append(((row, col), to_pos))
-        return valid_moves
+        return board.valid_moves(player)
 
     def get_all_unrevealed_positions(self, board):
         """
@@ -66,26 +98,93 @@ class MinMaxAgent:
         Returns:
         list: A list of positions with unrevealed pieces
         """
-        unrevealed_positions = []
-        for row in range(4):
-            for col in range(8):
-                piece = board.grid[row][col]
-                if piece and not piece.revealed:
-                    unrevealed_positions.append((row, col))
-        return unrevealed_positions
+        return board.unrevealed_positions()
+
+    def get_reveal_positions(self, board, ply):
+        """
+        Get the squares worth trying to reveal.
+
+        Every face-down square turns up a piece from the same hidden pool, but
+        where that piece lands still matters, since its neighbors decide what
+        it can capture and what can capture it. Only the root compares every
+        square; below the root just the first face-down square is tried. This
+        is a heuristic to keep the branching factor down, so the value of a
+        reveal deeper in the tree is only an estimate.
+
+        Parameters:
+        board (Board): The board object
+        ply (int): Distance from the root of the search
+
+        Returns:
+        list: A list of positions with unrevealed pieces
+        """
+        unrevealed_positions = self.get_all_unrevealed_positions(board)
+        return unrevealed_positions if ply == 0 else unrevealed_positions[:1]
+
+    def reveal_outcomes(self, board):
+        """
+        Get the pieces a reveal can turn up and their probabilities.
+
+        When reveal_samples is set and more distinct pieces are hidden, only
+        that many are drawn (weighted by how many of each are hidden) and
+        their probabilities are renormalized.
+
+        Parameters:
+        board (Board): The board object
+
+        Returns:
+        list: (code, probability) pairs for Board.apply_reveal_as
+        """
+        pool = board.hidden_pool()
+        if self.reveal_samples and len(pool) > self.reveal_samples:
+            rng = self.rng
+            pool = sorted(pool, key=lambda item: rng.random() ** (1.0 / item[1]), reverse=True)[:self.reveal_samples]
+        total = sum(count for _, count in pool)
+        return [(code, count / total) for code, count in pool]
+
+    def expected_reveal_score(self, board, pos, depth, maximizing_player, step_count, ply):
+        """
+        Score a reveal as a chance node: the probability-weighted average over the hidden pool.
 
-    def minimax(self, board, depth, maximizing_player, step_count):
+        Parameters:
+        board (Board): The board object
+        pos (tuple): The square to reveal
+        depth (int): The depth of the search
+        maximizing_player (bool): Whether the revealing player is the maximizing player
+        step_count (int): The current step count
+        ply (int): Distance from the root of the search
+
+        Returns:
+        float: The expected score
+        """
+        expected = 0
+        for code, probability in self.reveal_outcomes(board):
+            record = board.apply_reveal_as(pos, code)
+            eval, _ = self.minimax(board, depth - 1, not maximizing_player, step_count + 1, ply + 1)
+            board.undo(record)
+            expected += probability * eval
+        return expected
+
+    def minimax(self, board, depth, maximizing_player, step_count, ply=0):
         """
         Minimax algorithm to find the best move.
 
+        Reveals are chance nodes scored by expected_reveal_score.
+
         Parameters:
         board (Board): The board object
         depth (int): The depth of the search
         maximizing_player (bool): Whether the current player is the maximizing player
+        step_count (int): The current step count
+        ply (int): Distance from the root of the search
 
         Returns:
         tuple: Best score and best move (score, move)
         """
+        self.nodes += 1
+        if self.ply_nodes is not None:
+            self.ply_nodes[ply] += 1
+
         winner = board.check_winner(step_count)
         if winner == self.player:
             return 80, None
@@ -100,17 +199,14 @@ class MinMaxAgent:
         valid_moves = self.get_all_valid_moves(board, self.player if maximizing_player else 3 - self.player)
 
         if valid_moves:
+            self.move_nodes += 1
             if maximizing_player:
                 max_eval = float('-inf')
                 best_move = None
                 for move in valid_moves:
-                    from_pos, to_pos = move
-                    new_board = copy.deepcopy(board)
-                    if new_board.is_valid_move(from_pos, to_pos):
-                        new_board.move_piece(from_pos, to_pos)
-                    elif new_board.is_valid_capture(from_pos, to_pos):
-                        new_board.capture_piece(from_pos, to_pos)
-                    eval, _ = self.minimax(new_board, depth - 1, False, step_count + 1)
+                    record = board.apply_move(*move)
+                    eval, _ = self.minimax(board, depth - 1, False, step_count + 1, ply + 1)
+                    board.undo(record)
                     if eval > max_eval:
                         max_eval = eval
                         best_move = move
@@ -119,29 +215,24 @@ class MinMaxAgent:
                 min_eval = float('inf')
                 best_move = None
                 for move in valid_moves:
-                    from_pos, to_pos = move
-                    new_board = copy.deepcopy(board)
-                    if new_board.is_valid_move(from_pos, to_pos):
-                        new_board.move_piece(from_pos, to_pos)
-                    elif new_board.is_valid_capture(from_pos, to_pos):
-                        new_board.capture_piece(from_pos, to_pos)
-                    eval, _ = self.minimax(new_board, depth - 1, True, step_count + 1)
+                    record = board.apply_move(*move)
+                    eval, _ = self.minimax(board, depth - 1, True, step_count + 1, ply + 1)
+                    board.undo(record)
                     if eval < min_eval:
                         min_eval = eval
                         best_move = move
                 return min_eval, best_move
         else:
             if not board.all_pieces_revealed():
-                unrevealed_positions = self.get_all_unrevealed_positions(board)
+                unrevealed_positions = self.get_reveal_positions(board, ply)
                 if not unrevealed_positions:
                     return self.evaluate_board(board), None
-                
+                self.reveal_nodes += 1
+
                 best_score = float('-inf') if maximizing_player else float('inf')
                 best_move = None
                 for pos in unrevealed_positions:
-                    new_board = copy.deepcopy(board)
-                    new_board.grid[pos[0]][pos[1]].reveal()
-                    eval, _ = self.minimax(new_board, depth - 1, not maximizing_player, step_count + 1)
+                    eval = self.expected_reveal_score(board, pos, depth, maximizing_player, step_count, ply)
                     if maximizing_player:
                         if eval > best_score:
                             best_score = eval
@@ -154,6 +245,371 @@ class MinMaxAgent:
 
         return 0, None
 
+    def order_moves(self, board, moves, ply, first_move=None):
+        """
+        Sort moves so the ones most likely to cause a cutoff come first.
+
+        The given first move (usually the transposition table move) leads.
+        Captures come next, most valuable victim and then least valuable
+        attacker first. Quiet moves follow, killer moves for this ply first
+        and then by history score.
+
+        Parameters:
+        board (Board): The board object
+        moves (list): The moves to order (from_pos, to_pos)
+        ply (int): Distance from the root of the search
+        first_move (tuple): A move to try before all others, if it is in moves
+
+        Returns:
+        list: The ordered moves
+        """
+        squares = board.squares
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        def move_key(move):
+            if move == first_move:
+                return (3, 0)
+            from_pos, to_pos = move
+            victim = squares[to_pos[0] * COLS + to_pos[1]]
+            if victim:
+                attacker = squares[from_pos[0] * COLS + from_pos[1]]
+                return (2, CAPTURE_VALUES[victim & RANK_MASK] * 10 - CAPTURE_VALUES[attacker & RANK_MASK])
+            if move in killers:
+                return (1, -killers.index(move))
+            return (0, history.get(move, 0))
+
+        return sorted(moves, key=move_key, reverse=True)
+
+    def record_cutoff(self, move, depth, ply):
+        """
+        Remember a quiet move that caused a beta cutoff.
+
+        Parameters:
+        move (tuple): The move (from_pos, to_pos)
+        depth (int): The remaining depth at which the cutoff happened
+        ply (int): Distance from the root of the search
+        """
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def table_key(self, board, maximizing_player):
+        """
+        Get the transposition table key of a position.
+
+        With symmetric_tt the key is built from the canonical packed state, so
+        mirror images share an entry; moves are stored in the canonical frame
+        and mapped back with the returned transform.
+
+        Parameters:
+        board (Board): The board object
+        maximizing_player (bool): Whether the maximizing player is to move
+
+        Returns:
+        tuple: The key and the transform from the board to the stored frame
+        """
+        side = 0 if maximizing_player else ZOBRIST_SIDE
+        if self.symmetric_tt:
+            canonical, transform = canonicalize(board.state_key)
+            return canonical | ((board.pool_hash ^ side) << 128), transform
+        return board.hash ^ side, IDENTITY
+
+    def alphabeta(self, board, depth, alpha, beta, maximizing_player, step_count, ply=0):
+        """
+        Minimax with alpha-beta pruning and move ordering.
+
+        Returns the same score as minimax while skipping branches that cannot
+        change the result.
+
+        Parameters:
+        board (Board): The board object
+        depth (int): The depth of the search
+        alpha (float): The score the maximizing player is already assured of
+        beta (float): The score the minimizing player is already assured of
+        maximizing_player (bool): Whether the current player is the maximizing player
+        step_count (int): The current step count
+        ply (int): Distance from the root of the search
+
+        Returns:
+        tuple: Best score and best move (score, move)
+        """
+        self.nodes += 1
+        if self.ply_nodes is not None:
+            self.ply_nodes[ply] += 1
+        if self.nodes & 255 == 0 and (self.cancelled or self.deadline is not None and time.perf_counter() >= self.deadline):
+            self.stopped = True
+        if self.stopped:
+            return 0, None
+
+        winner = board.check_winner(step_count)
+        if winner == self.player:
+            return 80, None
+        elif winner == 3 - self.player:
+            return -80, None
+        elif winner == 0:
+            return 0, None
+
+        if depth == 0:
+            return self.evaluate_board(board), None
+
+        # Table keys leave out the step count, so positions whose search reaches
+        # the step limit (where the score depends on it) are neither probed nor stored
+        table = self.transposition_table if step_count + depth < SCORE_STEP_LIMIT else None
+        tt_move = self.pv_move if ply == 0 else None
+        if table is not None:
+            key, transform = self.table_key(board, maximizing_player)
+            entry = table.probe(key)
+            if entry is not None:
+                _, entry_depth, entry_score, bound, entry_move, _ = entry
+                entry_move = map_action(entry_move, transform)
+                tt_move = entry_move or tt_move
+                # Entries from below the root compared a single reveal square (see
+                # get_reveal_positions), so the root only uses them to order its actions
+                if entry_depth >= depth and ply > 0:
+                    if bound == EXACT:
+                        return entry_score, entry_move
+                    elif bound == LOWER_BOUND:
+                        alpha = max(alpha, entry_score)
+                    elif bound == UPPER_BOUND:
+                        beta = min(beta, entry_score)
+                    if alpha >= beta:
+                        return entry_score, entry_move
+            search_alpha, search_beta = alpha, beta
+
+        valid_moves = self.get_all_valid_moves(board, self.player if maximizing_player else 3 - self.player)
+
+        best_score = None
+        if valid_moves:
+            self.move_nodes += 1
+            best_score = float('-inf') if maximizing_player else float('inf')
+            best_move = None
+            for move in self.order_moves(board, valid_moves, ply, tt_move):
+                to_pos = move[1]
+                quiet = not board.squares[to_pos[0] * COLS + to_pos[1]]
+                record = board.apply_move(*move)
+                eval, _ = self.alphabeta(board, depth - 1, alpha, beta, not maximizing_player, step_count + 1, ply + 1)
+                board.undo(record)
+                if self.stopped:
+                    return 0, None
+                if maximizing_player:
+                    if eval > best_score:
+                        best_score = eval
+                        best_move = move
+                    alpha = max(alpha, eval)
+                else:
+                    if eval < best_score:
+                        best_score = eval
+                        best_move = move
+                    beta = min(beta, eval)
+                if alpha >= beta:
+                    if quiet:
+                        self.record_cutoff(move, depth, ply)
+                    break
+        elif not board.all_pieces_revealed():
+            self.reveal_nodes += 1
+            best_score = float('-inf') if maximizing_player else float('inf')
+            best_move = None
+            unrevealed_positions = self.get_reveal_positions(board, ply)
+            if tt_move is not None and tt_move[0] == 'reveal' and tt_move[1] in unrevealed_positions:
+                unrevealed_positions.remove(tt_move[1])
+                unrevealed_positions.insert(0, tt_move[1])
+            for pos in unrevealed_positions:
+                eval = self.expected_reveal_bound(board, pos, depth, alpha, beta, maximizing_player, step_count, ply)
+                if self.stopped:
+                    return 0, None
+                if maximizing_player:
+                    if eval > best_score:
+                        best_score = eval
+                        best_move = ('reveal', pos)
+                    alpha = max(alpha, eval)
+                else:
+                    if eval < best_score:
+                        best_score = eval
+                        best_move = ('reveal', pos)
+                    beta = min(beta, eval)
+                if alpha >= beta:
+                    break
+
+        if best_score is None:
+            return 0, None
+
+        if table is not None:
+            if best_score <= search_alpha:
+                bound = UPPER_BOUND
+            elif best_score >= search_beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            table.store(key, depth, best_score, bound, map_action(best_move, transform))
+        return best_score, best_move
+
+    def expected_reveal_bound(self, board, pos, depth, alpha, beta, maximizing_player, step_count, ply):
+        """
+        Score a reveal as a chance node inside the alpha-beta search.
+
+        Outcomes are searched with a full window. Once the outcomes left can
+        no longer bring the average inside (alpha, beta), even if they all
+        scored WIN_SCORE or -WIN_SCORE, the bound reached so far is returned.
+
+        Parameters:
+        board (Board): The board object
+        pos (tuple): The square to reveal
+        depth (int): The depth of the search
+        alpha (float): The score the maximizing player is already assured of
+        beta (float): The score the minimizing player is already assured of
+        maximizing_player (bool): Whether the revealing player is the maximizing player
+        step_count (int): The current step count
+        ply (int): Distance from the root of the search
+
+        Returns:
+        float: The expected score, or a bound on it outside (alpha, beta)
+        """
+        expected = 0
+        remaining = 1.0
+        for code, probability in self.reveal_outcomes(board):
+            record = board.apply_reveal_as(pos, code)
+            eval, _ = self.alphabeta(board, depth - 1, float('-inf'), float('inf'), not maximizing_player, step_count + 1, ply + 1)
+            board.undo(record)
+            if self.stopped:
+                return 0
+            expected += probability * eval
+            remaining -= probability
+            if expected + remaining * WIN_SCORE <= alpha:
+                return expected + remaining * WIN_SCORE
+            if expected - remaining * WIN_SCORE >= beta:
+                return expected - remaining * WIN_SCORE
+        return expected
+
+    def iterative_deepening(self, board, step_count):
+        """
+        Search one ply deeper at a time until the time budget runs out.
+
+        Each iteration tries the previous iteration's best move first. An
+        iteration cut off by the deadline is thrown away; the first iteration
+        always runs to completion so there is always a move to return.
+
+        Parameters:
+        board (Board): The board object
+        step_count (int): The current step count
+
+        Returns:
+        tuple: The best move of the deepest completed iteration
+        """
+        deadline = time.perf_counter() + self.time_limit_ms / 1000
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = {}
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        self.pv_move = None
+        self.completed_depth = 0
+        self.nodes = 0
+        best_move = None
+        for depth in range(1, MAX_SEARCH_DEPTH + 1):
+            self.deadline = deadline if depth > 1 else None
+            self.stopped = False
+            score, move = self.alphabeta(board, depth, float('-inf'), float('inf'), True, step_count)
+            if self.stopped:
+                break
+            best_move = self.pv_move = move
+            self.completed_depth = depth
+            if move is None or abs(score) >= WIN_SCORE or time.perf_counter() >= deadline:
+                break
+        self.deadline = None
+        self.stopped = False
+        return best_move
+
+    def root_actions(self, board, step_count):
+        """
+        List the actions to search at the root, best guess first.
+
+        Parameters:
+        board (Board): The board object
+        step_count (int): The current step count
+
+        Returns:
+        list: Moves (from_pos, to_pos), or reveals ('reveal', pos) when there is no move,
+              empty if the game is over
+        """
+        if board.check_winner(step_count) is not None:
+            return []
+        moves = self.get_all_valid_moves(board, self.player)
+        if moves:
+            return self.order_moves(board, moves, 0, self.pv_move)
+        if board.all_pieces_revealed():
+            return []
+        actions = [('reveal', pos) for pos in self.get_reveal_positions(board, 0)]
+        if self.pv_move in actions:
+            actions.remove(self.pv_move)
+            actions.insert(0, self.pv_move)
+        return actions
+
+    def parallel_search(self, board, step_count):
+        """
+        Search the root actions in worker processes and keep the best.
+
+        The first action in root_actions order is searched alone to get a
+        score to beat, then the others are searched in parallel against it.
+        The workers clear their tables once per call and keep them across
+        root actions and iterations; ties go to the earlier action. With time_limit_ms,
+        the depth grows one ply at a time as in iterative_deepening, and an
+        iteration cut off by the deadline is thrown away.
+
+        Parameters:
+        board (Board): The board object
+        step_count (int): The current step count
+
+        Returns:
+        tuple: The best move of the deepest completed search
+        """
+        self.killers = [[None, None]]
+        self.history = {}
+        self.pv_move = None
+        self.completed_depth = 0
+        self.parallel.new_search()
+        deadline = None if self.time_limit_ms is None else time.perf_counter() + self.time_limit_ms / 1000
+        depths = range(1, MAX_SEARCH_DEPTH + 1) if deadline is not None else (self.depth,)
+        best_move = None
+        for depth in depths:
+            actions = self.root_actions(board, step_count)
+            if not actions or self.cancelled:
+                break
+            iteration_deadline = deadline if depth > 1 else None
+            results = self.parallel.search(board, step_count, depth, actions[:1], deadline=iteration_deadline)
+            best_score = results[0][0]
+            if len(actions) > 1 and not results[0][2]:
+                results += self.parallel.search(board, step_count, depth, actions[1:], best_score, iteration_deadline)
+            self.nodes += 1 + sum(nodes for _, nodes, _ in results)
+            if any(stopped for _, _, stopped in results):
+                break
+            best_move = actions[0]
+            for (score, _, _), action in zip(results, actions):
+                if score > best_score:
+                    best_score, best_move = score, action
+            self.pv_move = best_move
+            self.completed_depth = depth
+            if abs(best_score) >= WIN_SCORE or (deadline is not None and time.perf_counter() >= deadline):
+                break
+        return best_move
+
+    def cancel(self):
+        """
+        Abandon the search running in another thread.
+
+        The alpha-beta search notices within a few hundred nodes and
+        choose_action returns None; the plain minimax search is not
+        interrupted.
+        """
+        self.cancelled = True
+
+    def close(self):
+        """Stop the worker processes of the parallel search, if any."""
+        if self.parallel is not None:
+            self.parallel.close()
+
     def choose_action(self, board, step_count):
         """
         Choose the best action for the current player.
@@ -165,5 +621,64 @@ class MinMaxAgent:
         Returns:
         tuple: The best move (action, pos)
         """
-        _, best_move = self.minimax(board, self.depth, True, step_count)
+        start = time.perf_counter()
+        self.cancelled = False
+        self.nodes = 0
+        self.move_nodes = 0
+        self.reveal_nodes = 0
+        self.ply_nodes = [0] * (max(self.depth, MAX_SEARCH_DEPTH) + 1) if self.metrics.enabled else None
+        table = self.transposition_table
+        tt_counts = (table.probes, table.hits) if table is not None else (0, 0)
+
+        if self.parallel is not None:
+            best_move = self.parallel_search(board, step_count)
+        elif self.time_limit_ms is not None:
+            best_move = self.iterative_deepening(board, step_count)
+        elif self.alpha_beta:
+            self.pv_move = None
+            self.killers = [[None, None] for _ in range(self.depth + 1)]
+            self.history = {}
+            if table is not None:
+                table.new_search()
+            _, best_move = self.alphabeta(board, self.depth, float('-inf'), float('inf'), True, step_count)
+        else:
+            _, best_move = self.minimax(board, self.depth, True, step_count)
+
+        if self.cancelled:
+            return None
+        if self.metrics.enabled:
+            self.record_search(best_move, time.perf_counter() - start, tt_counts)
         return best_move
+
+    def record_search(self, best_move, seconds, tt_counts):
+        """
+        Emit the statistics of the search that just finished.
+
+        Parameters:
+        best_move (tuple): The move the search chose
+        seconds (float): Wall time of the search
+        tt_counts (tuple): Transposition table probes and hits before the search
+        """
+        ply_nodes = self.ply_nodes
+        while len(ply_nodes) > 1 and not ply_nodes[-1]:
+            ply_nodes.pop()
+        ratios = [deeper / nodes for nodes, deeper in zip(ply_nodes, ply_nodes[1:]) if nodes]
+        table = self.transposition_table
+        tt_probes = table.probes - tt_counts[0] if table is not None else 0
+        tt_hits = table.hits - tt_counts[1] if table is not None else 0
+        self.metrics.emit(
+            'search',
+            player=self.player,
+            depth=self.completed_depth if self.time_limit_ms is not None else self.depth,
+            move=best_move,
+            seconds=seconds,
+            nodes=self.nodes,
+            nodes_per_sec=self.nodes / seconds if seconds else 0.0,
+            nodes_per_ply=ply_nodes,
+            branching_factor=sum(ratios) / len(ratios) if ratios else 0.0,
+            move_nodes=self.move_nodes,
+            reveal_nodes=self.reveal_nodes,
+            tt_probes=tt_probes,
+            tt_hits=tt_hits,
+            tt_hit_rate=tt_hits / tt_probes if tt_probes else 0.0,
+        )
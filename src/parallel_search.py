@@ -0,0 +1,118 @@
+# parallel_search.py
+# Author: Henry Shi
+
+import multiprocessing
+from board import Board
+
+# The search agent of a worker process, built by _init_worker
+_worker_agent = None
+
+# The search the worker's tables were last cleared for
+_worker_search_id = None
+
+def _init_worker(config):
+    """
+    Build the worker's search agent.
+
+    Parameters:
+    config (dict): Keyword arguments for MinMaxAgent
+    """
+    global _worker_agent
+    from minmax_agent import MinMaxAgent
+    _worker_agent = MinMaxAgent(alpha_beta=True, **config)
+
+def _search_root_action(task):
+    """
+    Search the position after one root action.
+
+    The worker's transposition table, killers and history are cleared when
+    the first task of a new search (a new move) arrives and kept for the rest
+    of it, so they carry over between root actions and between
+    iterative-deepening iterations.
+
+    Parameters:
+    task (tuple): The search id, encoded squares, step count, depth, the root
+                  action, the score the root is already assured of, the
+                  deadline as a time.perf_counter() value (or None) and a seed
+
+    Returns:
+    tuple: The score of the action (an upper bound if it is not above alpha),
+           nodes searched, and whether the deadline stopped the search
+    """
+    global _worker_search_id
+    search_id, squares, step_count, depth, action, alpha, deadline, seed = task
+    agent = _worker_agent
+    if search_id != _worker_search_id:
+        _worker_search_id = search_id
+        agent.killers = []
+        agent.history = {}
+        if agent.transposition_table is not None:
+            agent.transposition_table.clear()
+            agent.transposition_table.new_search()
+    while len(agent.killers) <= depth:
+        agent.killers.append([None, None])
+    board = Board(squares)
+    agent.rng.seed(seed)
+    agent.pv_move = None
+    agent.nodes = 0
+    agent.stopped = False
+    agent.deadline = deadline
+
+    if action[0] == 'reveal':
+        score = agent.expected_reveal_bound(board, action[1], depth, alpha, float('inf'), True, step_count, 0)
+    else:
+        board.apply_move(*action)
+        score, _ = agent.alphabeta(board, depth - 1, alpha, float('inf'), False, step_count + 1, 1)
+    stopped = agent.stopped
+    agent.deadline = None
+    agent.stopped = False
+    return score, agent.nodes, stopped
+
+class RootParallelSearch:
+    def __init__(self, num_workers, config):
+        """
+        Initialize a pool of processes that search root actions in parallel.
+
+        Parameters:
+        num_workers (int): Number of worker processes
+        config (dict): Keyword arguments for each worker's MinMaxAgent
+        """
+        self.num_workers = num_workers
+        self.config = config
+        self.pool = None
+        self.search_id = 0
+
+    def new_search(self):
+        """Have the workers clear their tables before the next task, as for a new move."""
+        self.search_id += 1
+
+    def search(self, board, step_count, depth, actions, alpha=float('-inf'), deadline=None):
+        """
+        Score every root action to the same depth.
+
+        Parameters:
+        board (Board): The board at the root
+        step_count (int): The current step count
+        depth (int): The depth of the search, counting the root action
+        actions (list): Root moves (from_pos, to_pos) or reveals ('reveal', pos)
+        alpha (float): Score the root is already assured of; actions that cannot
+                       beat it are only searched far enough to prove it
+        deadline (float): time.perf_counter() at which the workers give up, None for no limit
+
+        Returns:
+        list: (score, nodes, stopped) for each action, in the order of actions
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers, _init_worker, (self.config,))
+        squares = bytes(board.squares)
+        seed = self.config.get('seed') or 0
+        tasks = [(self.search_id, squares, step_count, depth, action, alpha, deadline, hash((seed, depth, index)))
+                 for index, action in enumerate(actions)]
+        return self.pool.map(_search_root_action, tasks, chunksize=1)
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,127 @@
+# ponder.py
+# Author: Henry Shi
+
+import threading
+from board import COLS, RANK_MASK
+from minmax_agent import CAPTURE_VALUES
+
+def position_key(board, step_count):
+    """
+    Key a position by what the players can see of it.
+
+    Parameters:
+    board (Board): The board object
+    step_count (int): The step count the position is searched at
+
+    Returns:
+    tuple: The packed visible squares, the hidden pool hash and the step count
+    """
+    return (board.state_key, board.pool_hash, step_count)
+
+class Ponderer:
+    def __init__(self, agent, max_positions=16):
+        """
+        Initialize a helper that searches on the opponent's time.
+
+        While the opponent is thinking, the agent searches the positions its
+        most likely replies lead to and keeps its answer to each. If the
+        opponent then plays one of them, the answer is ready at once; if not,
+        the agent's transposition table is still warm from the searches.
+
+        Parameters:
+        agent (MinMaxAgent): The agent to ponder with; it must not search elsewhere meanwhile
+        max_positions (int): Most positions searched per opponent turn
+        """
+        self.agent = agent
+        self.max_positions = max_positions
+        self.cache = {}  # position_key -> the agent's chosen action
+        self.thread = None
+        self.stop_requested = False
+        self.hits = 0
+        self.misses = 0
+
+    def predicted_positions(self, board, player):
+        """
+        Generate the positions after the opponent's likely replies, most likely first.
+
+        Captures come first, best victim first, then the other moves. Then
+        come reveals of each face-down square as the piece most likely to
+        turn up.
+
+        Parameters:
+        board (Board): The board with the opponent to move; it is changed while
+                       a position is yielded and restored before the next
+        player (int): The opponent's player number
+
+        Yields:
+        Board: The board after one reply
+        """
+        squares = board.squares
+        moves = sorted(board.valid_moves(player),
+                       key=lambda move: -CAPTURE_VALUES[squares[move[1][0] * COLS + move[1][1]] & RANK_MASK])
+        for move in moves:
+            record = board.apply_move(*move)
+            yield board
+            board.undo(record)
+        pool = board.hidden_pool()
+        if pool:
+            likely_code = max(pool, key=lambda item: item[1])[0]
+            for pos in board.unrevealed_positions():
+                record = board.apply_reveal_as(pos, likely_code)
+                yield board
+                board.undo(record)
+
+    def _ponder(self, board, step_count):
+        """Thread body: search predicted positions until stopped or out of budget."""
+        player = 3 - self.agent.player
+        for count, position in enumerate(self.predicted_positions(board, player)):
+            if self.stop_requested or count >= self.max_positions:
+                break
+            if position.check_winner(step_count) is not None:
+                continue
+            action = self.agent.choose_action(position, step_count)
+            if self.stop_requested or action is None:
+                break
+            self.cache[position_key(position, step_count)] = action
+
+    def start(self, board, step_count):
+        """
+        Start pondering while the opponent thinks.
+
+        Parameters:
+        board (Board): The board with the opponent to move
+        step_count (int): The step count the agent will search at after the reply
+        """
+        self.stop()
+        self.cache = {}
+        self.stop_requested = False
+        self.thread = threading.Thread(target=self._ponder, args=(board.copy(), step_count), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop pondering and wait for the search in progress to give up."""
+        if self.thread is None:
+            return
+        self.stop_requested = True
+        while self.thread.is_alive():
+            self.agent.cancel()
+            self.thread.join(0.01)
+        self.thread = None
+
+    def lookup(self, board, step_count):
+        """
+        Get the pondered action for the position reached, if there is one.
+
+        Parameters:
+        board (Board): The board with the agent to move
+        step_count (int): The current step count
+
+        Returns:
+        tuple: The pondered action on a ponder hit, otherwise None
+        """
+        action = self.cache.get(position_key(board, step_count))
+        if action is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return action
@@ -4,18 +4,27 @@
 import numpy as np
 import random
 import pickle
+from qtable import LEAST_VISITED, BoundedQTable
+from qtable_store import QTableStore, is_table_file, write_q_table
+from state_encoding import convert_q_table
+from symmetry import canonicalize
 
 class QLearningAgent:
 
 
-    def __init__(self, alpha=0.3, gamma=0.8, epsilon=0.1, actions=None, player=1):
+    def __init__(self, alpha=0.3, gamma=0.8, epsilon=0.1, actions=None, player=1, use_symmetry=False,
+                 capacity=None, eviction=LEAST_VISITED, protect_above=None):
         self.alpha = alpha #Learning rate, 30% new data
         self.gamma = gamma #Discount factor, 80% future reward
         self.epsilon = epsilon #Exploration rate, 10% random move
 
-        self.q_table = {}
+        #Bounded table for long runs, see qtable.BoundedQTable
+        self.q_table = BoundedQTable(capacity, eviction, protect_above) if capacity else {}
+        self.visit_counts = None  # Set to a dict to count updates per (state, action)
+        self.replay_buffer = None  # Set to a ReplayBuffer to keep transitions for replay()
         self.actions = actions if actions is not None else []
         self.player = player
+        self.use_symmetry = use_symmetry #Share entries between mirrored boards
 
     def get_state(self, board):
         """
@@ -25,23 +34,25 @@ class QLearningAgent:
         board (Board): The board object
 
         Returns:
-        tuple: A tuple representation of the board state
+        int: The board state packed into one integer (see state_encoding),
+             canonicalized over mirror images and colors when use_symmetry is set
         """
-        return tuple(tuple((piece.rank, piece.player, piece.revealed) if piece else None for piece in row) for row in board.grid)
+        if self.use_symmetry:
+            return canonicalize(board.state_key, self.player)[0]
+        return board.state_key
 
     def choose_action(self, state, board):
         """
         Choose the best action based on the current state and epsilon-greedy policy.
 
         Parameters:
-        state (tuple): The current state
+        state (int): The current state
         board (Board): The board object
 
         Returns:
         str: The chosen action
         """
-        unflipped_positions = [(r, c) for r in range(len(board.grid)) for c in range(len(board.grid[0])) if board.grid[r][c] and not board.grid[r][c].revealed]
-        valid_actions = self.actions if unflipped_positions else ['move']
+        valid_actions = self.actions if board.unrevealed else ['move']
 
         if np.random.rand() < self.epsilon:
             return np.random.choice(valid_actions)
@@ -53,22 +64,24 @@ class QLearningAgent:
         Update the Q-table using the Q-learning update rule.
 
         Parameters:
-        state (tuple): The current state
+        state (int): The current state
         action (str): The action taken
         reward (int): The received reward
-        next_state (tuple): The next state
+        next_state (int): The next state
         """
         old_q_value = self.q_table.get((state, action), 0)
         next_max_q_value = max([self.q_table.get((next_state, a), 0) for a in self.actions], default=0)
         new_q_value = old_q_value + self.alpha * (reward + self.gamma * next_max_q_value - old_q_value)
         self.q_table[(state, action)] = new_q_value
+        if self.visit_counts is not None:
+            self.visit_counts[(state, action)] = self.visit_counts.get((state, action), 0) + 1
 
     def step(self, state, action, board, step_count):
         """
         Take a step in the environment based on the action and update the state.
 
         Parameters:
-        state (tuple): The current state
+        state (int): The current state
         action (str): The action taken
         board (Board): The board object
         step_count (int): The current step count
@@ -81,7 +94,7 @@ class QLearningAgent:
         action_detail = ""
 
         if action == 'flip':
-            unflipped_positions = [(r, c) for r in range(len(board.grid)) for c in range(len(board.grid[0])) if board.grid[r][c] and not board.grid[r][c].revealed]
+            unflipped_positions = board.unrevealed_positions()
             if unflipped_positions:
                 pos = random.choice(unflipped_positions)
                 piece = board.grid[pos[0]][pos[1]]
@@ -92,11 +105,10 @@ class QLearningAgent:
                 action = 'move'
 
         if action == 'move':
-            valid_moves = [(from_pos, to_pos) for from_pos in [(r, c) for r in range(len(board.grid)) for c in range(len(board.grid[0])) if board.grid[r][c] and board.grid[r][c].revealed and board.grid[r][c].player == self.player]
-                           for to_pos in [(from_pos[0] + dr, from_pos[1] + dc) for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]] if 0 <= to_pos[0] < 4 and 0 <= to_pos[1] < 8 and (board.is_valid_move(from_pos, to_pos) or board.is_valid_capture(from_pos, to_pos))]
+            valid_moves = board.valid_moves(self.player)
             if valid_moves:
                 from_pos, to_pos = random.choice(valid_moves)
-                if board.grid[to_pos[0]][to_pos[1]] is None:
+                if board.is_valid_move(from_pos, to_pos):
                     board.move_piece(from_pos, to_pos)
                     reward = -1
                     action_detail = f"moved piece from ({from_pos[0]}, {from_pos[1]}) to ({to_pos[0]}, {to_pos[1]})"
@@ -122,32 +134,116 @@ class QLearningAgent:
 
         return next_state, reward, done, action_detail
 
+    def table_size(self):
+        """
+        Get the number of learned values, for progress reports.
+
+        Returns:
+        int: The number of Q-table entries
+        """
+        return len(self.q_table)
+
     def save_q_table(self, filename):
         """
         Save the Q-table to a file.
 
+        The table is written as sorted records (see qtable_store). A table
+        opened from the same file only has its updates appended to the log.
+
         Parameters:
         filename (str): The name of the file to save the Q-table
         """
-        with open(filename, 'wb') as f:
-            pickle.dump(self.q_table, f)
+        if isinstance(self.q_table, QTableStore):
+            self.q_table.save(filename)
+        else:
+            write_q_table(filename, self.q_table)
 
     def load_q_table(self, filename):
         """
         Load the Q-table from a file.
 
+        Table files are memory-mapped and read lazily, so loading is instant.
+        Pickled tables are read in full, and the old tuple states are
+        converted to packed states. A bounded table is refilled from the file,
+        evicting entries if it holds more than the capacity.
+
         Parameters:
         filename (str): The name of the file to load the Q-table from
         """
-        with open(filename, 'rb') as f:
-            self.q_table = pickle.load(f)
+        if is_table_file(filename):
+            q_table = QTableStore(filename)
+        else:
+            with open(filename, 'rb') as f:
+                q_table = pickle.load(f)
+            first_key = next(iter(q_table), None)
+            if first_key is not None and isinstance(first_key[0], tuple):
+                q_table = convert_q_table(q_table)
+        if isinstance(self.q_table, BoundedQTable):
+            bounded = BoundedQTable(self.q_table.capacity, self.q_table.policy, self.q_table.protect_above)
+            bounded.load(q_table)
+            q_table = bounded
+        self.q_table = q_table
+
+    def update_q_table_from_experience(self, experiences, weights=None):
+        """
+        Update the Q-table from a batch of experiences.
+
+        Every target is computed from the table as it was before the batch,
+        then all updates are applied. An experience that ended the game has no
+        future reward.
+
+        Parameters:
+        experiences (list): A list of experiences (state, action, reward, next state),
+                            optionally followed by a done flag
+        weights (np.ndarray): Scale of each experience's update, None for all 1
 
-    def update_q_table_from_experience(self, experiences):
+        Returns:
+        np.ndarray: The TD error of each experience
+        """
+        q_table = self.q_table
+        keys = []
+        td_errors = np.empty(len(experiences))
+        for i, experience in enumerate(experiences):
+            state, action, reward, next_state = experience[:4]
+            done = len(experience) > 4 and experience[4]
+            old_q_value = q_table.get((state, action), 0)
+            next_max_q_value = 0 if done else max([q_table.get((next_state, a), 0) for a in self.actions], default=0)
+            keys.append((state, action, old_q_value))
+            td_errors[i] = reward + self.gamma * next_max_q_value - old_q_value
+        steps = self.alpha * td_errors if weights is None else self.alpha * weights * td_errors
+        for (state, action, old_q_value), step in zip(keys, steps.tolist()):
+            q_table[(state, action)] = old_q_value + step
+        return td_errors
+
+    def remember(self, state, action, reward, next_state, done):
+        """
+        Add a transition to the replay buffer, if the agent has one.
+
+        Parameters:
+        state (int): The current state
+        action (str): The action taken
+        reward (int): The received reward
+        next_state (int): The next state
+        done (bool): Whether the game ended
         """
-        Update the Q-table from a list of experiences.
+        if self.replay_buffer is not None:
+            self.replay_buffer.add(state, action, reward, next_state, done)
+
+    def replay(self, batch_size, prioritized=False):
+        """
+        Update the Q-table from a minibatch sampled from the replay buffer.
+
+        With prioritized sampling, the sampled transitions' priorities are set
+        to their new absolute TD errors.
 
         Parameters:
-        experiences (list): A list of experiences (state, action, reward, next state)
+        batch_size (int): Number of transitions to sample
+        prioritized (bool): Sample by priority instead of uniformly
         """
-        for state, action, reward, next_state in experiences:
-            self.update_q_table(state, action, reward, next_state)
+        buffer = self.replay_buffer
+        if buffer is None or len(buffer) < batch_size:
+            return
+        indices, experiences, weights = buffer.sample(batch_size, prioritized)
+        td_errors = self.update_q_table_from_experience(experiences, weights)
+        if prioritized:
+            buffer.update_priorities(indices, np.abs(td_errors))
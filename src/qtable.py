@@ -0,0 +1,185 @@
+# qtable.py
+# Author: Henry Shi
+
+import heapq
+from collections import OrderedDict
+
+# Eviction policies
+LEAST_VISITED = 'lfu'
+LEAST_RECENT = 'lru'
+
+# Share of the capacity freed by one round of eviction, so evicting is not
+# repeated on every insert once the table is full
+EVICT_FRACTION = 1 / 16
+
+class BoundedQTable:
+    def __init__(self, capacity, policy=LEAST_VISITED, protect_above=None):
+        """
+        Initialize a Q-table holding at most capacity entries.
+
+        It can be used in place of the dict in QLearningAgent.q_table. When an
+        insert takes the table over capacity, the least visited (LEAST_VISITED)
+        or least recently used (LEAST_RECENT) entries are evicted. Entries with
+        a value above protect_above are never evicted, so the table may grow
+        past capacity if too many entries are protected.
+
+        Parameters:
+        capacity (int): Maximum number of entries
+        policy (str): LEAST_VISITED or LEAST_RECENT
+        protect_above (float): Entries valued above this are kept, None to protect nothing
+        """
+        if policy not in (LEAST_VISITED, LEAST_RECENT):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.protect_above = protect_above
+        self.values = OrderedDict() if policy == LEAST_RECENT else {}
+        self.visits = {}  # (state, action) -> number of updates
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Get the value of a (state, action) key, counting a hit or a miss.
+
+        Parameters:
+        key (tuple): The (state, action) key
+        default: Value returned when the key is not in the table
+
+        Returns:
+        float: The stored value, or default
+        """
+        value = self.values.get(key)
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.policy == LEAST_RECENT:
+            self.values.move_to_end(key)
+        return value
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        """Set the value of a key and count a visit to it."""
+        values = self.values
+        is_new = key not in values
+        values[key] = value
+        self.visits[key] = self.visits.get(key, 0) + 1
+        if self.policy == LEAST_RECENT and not is_new:
+            values.move_to_end(key)
+        if is_new and len(values) > self.capacity:
+            self.evict(key)
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def items(self):
+        return self.values.items()
+
+    def update(self, other):
+        """
+        Set the values of several keys.
+
+        Parameters:
+        other (dict): Values keyed by (state, action)
+        """
+        for key, value in other.items():
+            self[key] = value
+
+    def load(self, q_table):
+        """
+        Fill the table from a saved Q-table without counting visits.
+
+        Parameters:
+        q_table (dict): Values keyed by (state, action)
+        """
+        for key, value in q_table.items():
+            self.values[key] = value
+        if len(self.values) > self.capacity:
+            self.evict()
+
+    def usage_state(self):
+        """
+        Get everything eviction depends on besides the values.
+
+        Returns:
+        dict: The keys in table order (the LRU order), visit counts and usage counters
+        """
+        return {
+            'order': list(self.values),
+            'visits': dict(self.visits),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def restore_usage(self, state, q_table):
+        """
+        Rebuild the table as it was when usage_state was taken.
+
+        Parameters:
+        state (dict): As returned by usage_state
+        q_table (dict): The values saved with it, keyed by (state, action)
+        """
+        values = OrderedDict() if self.policy == LEAST_RECENT else {}
+        for key in state['order']:
+            values[key] = q_table[key]
+        self.values = values
+        self.visits = dict(state['visits'])
+        self.hits = state['hits']
+        self.misses = state['misses']
+        self.evictions = state['evictions']
+
+    def evict(self, keep=None):
+        """
+        Evict entries until the table is EVICT_FRACTION under capacity.
+
+        Parameters:
+        keep (tuple): A key that must not be evicted, such as the one just inserted
+        """
+        target = self.capacity - max(1, int(self.capacity * EVICT_FRACTION))
+        count = len(self.values) - target
+        if count <= 0:
+            return
+        protect_above = self.protect_above
+        candidates = (key for key, value in self.values.items()
+                      if key != keep and (protect_above is None or value <= protect_above))
+        if self.policy == LEAST_RECENT:
+            victims = []
+            for key in candidates:
+                victims.append(key)
+                if len(victims) == count:
+                    break
+        else:
+            visits = self.visits
+            victims = heapq.nsmallest(count, candidates, key=lambda key: visits.get(key, 0))
+        for key in victims:
+            del self.values[key]
+            self.visits.pop(key, None)
+        self.evictions += len(victims)
+
+    def stats(self):
+        """
+        Get the table's size and usage counters.
+
+        Returns:
+        dict: size, capacity, hits, misses, hit_rate and evictions
+        """
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.values),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
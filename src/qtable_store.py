@@ -0,0 +1,303 @@
+# qtable_store.py
+# Author: Henry Shi
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from state_encoding import STATE_BYTES, convert_q_table
+
+# File layout: a header, then fixed-width records sorted by key. A record is
+# the packed state (big-endian, so byte order is numeric order), the action
+# id and the Q-value as a little-endian double.
+MAGIC = b'FCQTABLE'
+VERSION = 1
+_HEADER = struct.Struct('<8sIQ')  # Magic, version, record count
+HEADER_SIZE = _HEADER.size
+KEY_SIZE = STATE_BYTES + 1
+RECORD_SIZE = KEY_SIZE + 8
+_VALUE = struct.Struct('<d')
+
+# Actions stored as one byte, in QLearningAgent's order
+ACTIONS = ('flip', 'move')
+_ACTION_IDS = {action: index for index, action in enumerate(ACTIONS)}
+
+# Suffix of the append-only log of updates kept next to a table file
+LOG_SUFFIX = '.log'
+
+# The log is folded into the table once it holds more records than this and
+# more than the table itself
+COMPACT_MIN_RECORDS = 1 << 16
+
+def _pack_key(key):
+    """Pack a (state, action) key into its KEY_SIZE bytes."""
+    state, action = key
+    return state.to_bytes(STATE_BYTES, 'big') + bytes((_ACTION_IDS[action],))
+
+def _unpack_key(data):
+    """Unpack KEY_SIZE bytes back into a (state, action) key."""
+    return int.from_bytes(data[:STATE_BYTES], 'big'), ACTIONS[data[STATE_BYTES]]
+
+def new_file_mode():
+    """
+    Get the permissions a file created with open() would get.
+
+    tempfile.mkstemp creates files readable by their owner only, so files
+    written through a temporary file are given these permissions before they
+    are moved into place.
+
+    Returns:
+    int: 0o666 without the bits of the process umask
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def is_table_file(filename):
+    """
+    Check whether a file holds a table in this format.
+
+    Parameters:
+    filename (str): The file to check
+
+    Returns:
+    bool: True if the file starts with the table header
+    """
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def write_q_table(filename, q_table):
+    """
+    Write a Q-table to a file as sorted records.
+
+    The file is written next to its destination, synced to disk and moved
+    into place, so a reader never sees a partly written table. It gets the
+    usual permissions of a new file, so other users can read it. Any update
+    log of the old file is removed before the new file replaces it, so a
+    crash in between leaves the old table without its recent updates rather
+    than the new table with a stale log applied on top.
+
+    Parameters:
+    filename (str): The file to write
+    q_table (dict): Q-table keyed by (packed state, action)
+    """
+    records = sorted((_pack_key(key), value) for key, value in q_table.items())
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(records)))
+            f.write(b''.join(key + _VALUE.pack(value) for key, value in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_name, new_file_mode())
+        if os.path.exists(filename + LOG_SUFFIX):
+            os.unlink(filename + LOG_SUFFIX)
+        os.replace(temp_name, filename)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+class QTableStore:
+    def __init__(self, filename):
+        """
+        Open a Q-table file for lazy lookups.
+
+        The sorted records are memory-mapped and binary searched on each
+        lookup, so opening is instant whatever the table size and processes
+        reading the same file share its pages. Updates are held in memory and
+        appended to the file's log by flush(); the log is read back when the
+        table is opened again.
+
+        Parameters:
+        filename (str): The table file, as written by write_q_table
+        """
+        self.filename = filename
+        self._file = None
+        self._mmap = None
+        self._count = 0
+        self._overlay = {}  # (state, action) -> value, from the log and new updates
+        self._pending = set()  # Keys updated since the last flush
+        self._open()
+
+    def _open(self):
+        """Map the table file and read its update log."""
+        self._file = open(self.filename, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.filename} is not a version {VERSION} Q-table file")
+        self._overlay = {}
+        log_name = self.filename + LOG_SUFFIX
+        if os.path.exists(log_name):
+            with open(log_name, 'rb') as f:
+                data = f.read()
+            # A record cut short by a crash while appending is ignored
+            for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+                key = _unpack_key(data[offset:offset + KEY_SIZE])
+                self._overlay[key] = _VALUE.unpack_from(data, offset + KEY_SIZE)[0]
+
+    def close(self):
+        """Unmap the table file. Unflushed updates are lost."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def _lookup(self, packed_key):
+        """Binary search the mapped records for a packed key, None if absent."""
+        data = self._mmap
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER_SIZE + middle * RECORD_SIZE
+            record_key = data[offset:offset + KEY_SIZE]
+            if record_key < packed_key:
+                low = middle + 1
+            elif record_key > packed_key:
+                high = middle
+            else:
+                return _VALUE.unpack_from(data, offset + KEY_SIZE)[0]
+        return None
+
+    def get(self, key, default=None):
+        """
+        Get the value of a (state, action) key.
+
+        Parameters:
+        key (tuple): The (packed state, action) key
+        default: Value returned when the key is not in the table
+
+        Returns:
+        float: The stored value, or default
+        """
+        value = self._overlay.get(key)
+        if value is None:
+            value = self._lookup(_pack_key(key))
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._overlay[key] = value
+        self._pending.add(key)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def update(self, other):
+        """
+        Set the values of several keys.
+
+        Parameters:
+        other (dict): Values keyed by (packed state, action)
+        """
+        self._overlay.update(other)
+        self._pending.update(other)
+
+    def items(self):
+        """
+        Iterate over every (key, value) pair, updates included.
+
+        Returns:
+        generator: (state, action), value pairs
+        """
+        data = self._mmap
+        for index in range(self._count):
+            offset = HEADER_SIZE + index * RECORD_SIZE
+            key = _unpack_key(data[offset:offset + KEY_SIZE])
+            if key not in self._overlay:
+                yield key, _VALUE.unpack_from(data, offset + KEY_SIZE)[0]
+        yield from self._overlay.items()
+
+    def __iter__(self):
+        return (key for key, _ in self.items())
+
+    def __len__(self):
+        return self._count + sum(1 for key in self._overlay if self._lookup(_pack_key(key)) is None)
+
+    def flush(self):
+        """
+        Append the updates made since the last flush to the log.
+
+        The table is compacted instead once the log grows larger than the
+        table and COMPACT_MIN_RECORDS.
+        """
+        if len(self._overlay) > max(self._count, COMPACT_MIN_RECORDS):
+            self.compact()
+            return
+        if not self._pending:
+            return
+        with open(self.filename + LOG_SUFFIX, 'ab') as f:
+            f.write(b''.join(_pack_key(key) + _VALUE.pack(self._overlay[key]) for key in self._pending))
+        self._pending = set()
+
+    def compact(self):
+        """Rewrite the table file with every update merged in, and drop the log."""
+        q_table = dict(self.items())
+        self.close()
+        write_q_table(self.filename, q_table)
+        self._pending = set()
+        self._open()
+
+    def save(self, filename):
+        """
+        Save the table.
+
+        Saving to the file the table was opened from only appends the
+        updates to its log; any other file gets a full copy.
+
+        Parameters:
+        filename (str): The file to save to
+        """
+        if os.path.abspath(filename) == os.path.abspath(self.filename):
+            self.flush()
+        else:
+            write_q_table(filename, dict(self.items()))
+
+    def reopen(self, filename):
+        """
+        Switch to another file holding the same entries, and close this one.
+
+        Parameters:
+        filename (str): A full copy of the table, as written by save()
+        """
+        self.close()
+        self.filename = filename
+        self._pending = set()
+        self._open()
+
+    def __getstate__(self):
+        # Child processes reopen the file rather than copying the records
+        return {'filename': self.filename, 'overlay': self._overlay, 'pending': self._pending}
+
+    def __setstate__(self, state):
+        self.filename = state['filename']
+        self._open()
+        self._overlay = state['overlay']
+        self._pending = state['pending']
+
+def convert_pickle_file(source, destination):
+    """
+    Convert a pickled Q-table file to the memory-mapped format.
+
+    Parameters:
+    source (str): The pickled Q-table to read (tuple states are converted too)
+    destination (str): Where to write the table
+    """
+    with open(source, 'rb') as f:
+        q_table = pickle.load(f)
+    write_q_table(destination, convert_q_table(q_table))
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python qtable_store.py OLD_Q_TABLE.pkl NEW_Q_TABLE.pkl")
+        sys.exit(1)
+    convert_pickle_file(sys.argv[1], sys.argv[2])
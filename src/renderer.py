@@ -0,0 +1,199 @@
+# renderer.py
+# Author: Henry Shi
+
+import pygame
+from board import NUM_SQUARES, OWNER_BIT, POSITIONS, RANKS, REVEALED_BIT
+
+# Define colors
+WHITE, BLACK, BLUE, RED, LIGHT_BLUE = (255, 255, 255), (0, 0, 0), (0, 0, 255), (255, 0, 0), (173, 216, 230)
+
+# What a face-down square shows, whatever piece is under it
+HIDDEN = -1
+
+# Most rendered texts kept; the cache is emptied when it is full
+TEXT_CACHE_SIZE = 256
+
+_fonts = {}
+
+def get_font(size):
+    """
+    Get the default font at a size, creating it only once.
+
+    Parameters:
+    size (int): The font size
+
+    Returns:
+    pygame.font.Font: The font
+    """
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def square_view(code):
+    """
+    Get what a square shows, so squares that look the same compare equal.
+
+    Parameters:
+    code (int): The encoded square value
+
+    Returns:
+    int: 0 for an empty square, HIDDEN for a face-down piece, otherwise the code
+    """
+    if code and not code & REVEALED_BIT:
+        return HIDDEN
+    return code
+
+class BoardRenderer:
+    def __init__(self, win, piece_images, square_size=100):
+        """
+        Initialize a renderer that repaints only what changed since the last frame.
+
+        The checkerboard is drawn once into a background surface and the
+        sprites are converted to the window's pixel format. Each frame, only
+        the squares whose contents changed (and the squares under text that
+        changed) are repainted and passed to pygame.display.update.
+
+        Parameters:
+        win (pygame.Surface): The game window; the display mode must already be set
+        piece_images (dict): Sprites keyed like 'K_black', sized to a square
+        square_size (int): Width and height of a square in pixels
+        """
+        self.win = win
+        self.square_size = square_size
+        self.background = self._draw_background()
+        self.hidden_tile = pygame.Surface((square_size, square_size)).convert()
+        self.hidden_tile.fill(LIGHT_BLUE)
+        pygame.draw.rect(self.hidden_tile, BLACK, (0, 0, square_size, square_size), 1)
+        self.sprites = {}  # Revealed code -> converted sprite
+        for rank_id, rank in enumerate(RANKS):
+            if rank is None:
+                continue
+            for owner_bit, color in ((0, 'black'), (OWNER_BIT, 'white')):
+                image = piece_images.get(f"{rank}_{color}")
+                if image is not None:
+                    self.sprites[REVEALED_BIT | owner_bit | rank_id] = image.convert_alpha()
+        self.square_rects = [pygame.Rect(col * square_size, row * square_size, square_size, square_size)
+                             for row, col in POSITIONS]
+        self.drawn = [None] * NUM_SQUARES  # square_view of what each square shows on screen
+        self.texts = {}  # (message, size, color) -> rendered surface
+        self.drawn_texts = []  # (surface, rect) of the text on screen
+        self.stale_rects = []  # Areas drawn over outside render, repainted next frame
+        self.full_redraw = True
+
+    def _draw_background(self):
+        """Draw the empty checkerboard once."""
+        size = self.square_size
+        background = pygame.Surface(self.win.get_size()).convert()
+        background.fill(WHITE)
+        for row, col in POSITIONS:
+            pygame.draw.rect(background, BLUE if (row + col) % 2 == 0 else RED, (col * size, row * size, size, size))
+            pygame.draw.rect(background, BLACK, (col * size, row * size, size, size), 1)
+        return background
+
+    def invalidate(self):
+        """Repaint the whole window on the next frame."""
+        self.full_redraw = True
+
+    def text(self, message, size=24, color=BLACK):
+        """
+        Get a rendered text surface, rendering each distinct text only once.
+
+        Parameters:
+        message (str): The text
+        size (int): The font size
+        color (tuple): The text color
+
+        Returns:
+        pygame.Surface: The rendered text
+        """
+        key = (message, size, color)
+        surface = self.texts.get(key)
+        if surface is None:
+            if len(self.texts) >= TEXT_CACHE_SIZE:
+                self.texts.clear()
+            surface = self.texts[key] = get_font(size).render(message, True, color)
+        return surface
+
+    def _draw_square(self, index, view):
+        """Paint one square from the background and its piece."""
+        rect = self.square_rects[index]
+        self.win.blit(self.background, rect, rect)
+        if view == HIDDEN:
+            self.win.blit(self.hidden_tile, rect)
+        elif view:
+            sprite = self.sprites.get(view)
+            if sprite is not None:
+                self.win.blit(sprite, rect)
+
+    def render(self, board, texts=()):
+        """
+        Draw a frame and update the changed parts of the display.
+
+        Parameters:
+        board (Board): The board to show
+        texts (list): Text to draw over the board, as (message, size, color, topleft)
+        """
+        new_texts = []
+        for message, size, color, topleft in texts:
+            surface = self.text(message, size, color)
+            new_texts.append((surface, surface.get_rect(topleft=topleft)))
+
+        if self.full_redraw:
+            self.win.blit(self.background, (0, 0))
+            for index, code in enumerate(board.squares):
+                view = square_view(code)
+                self._draw_square(index, view)
+                self.drawn[index] = view
+            for surface, rect in new_texts:
+                self.win.blit(surface, rect)
+            self.drawn_texts = new_texts
+            self.stale_rects = []
+            self.full_redraw = False
+            pygame.display.update()
+            return
+
+        # Text that appeared, moved or went away leaves the squares under it to repaint
+        areas = list(self.stale_rects)
+        if new_texts != self.drawn_texts:
+            areas.extend(text[1] for text in self.drawn_texts if text not in new_texts)
+            areas.extend(text[1] for text in new_texts if text not in self.drawn_texts)
+        views = [square_view(code) for code in board.squares]
+        dirty = {index for index, view in enumerate(views) if view != self.drawn[index]}
+        # Text is antialiased, so it is only redrawn over freshly painted squares
+        while True:
+            dirty.update(index for index, rect in enumerate(self.square_rects) if rect.collidelist(areas) != -1)
+            dirty_rects = [self.square_rects[index] for index in dirty]
+            covered = [rect for _, rect in new_texts if rect not in areas and rect.collidelist(dirty_rects) != -1]
+            if not covered:
+                break
+            areas.extend(covered)
+        if not dirty:
+            return
+
+        for index in dirty:
+            self._draw_square(index, views[index])
+            self.drawn[index] = views[index]
+        for surface, rect in new_texts:
+            if rect in areas:
+                self.win.blit(surface, rect)
+        self.drawn_texts = new_texts
+        self.stale_rects = []
+        pygame.display.update(dirty_rects)
+
+    def show_message(self, message, size=36, color=RED):
+        """
+        Draw a message in the middle of the window and show it at once.
+
+        The squares under it are repainted on the next frame.
+
+        Parameters:
+        message (str): The message to display
+        size (int): The font size
+        color (tuple): The text color
+        """
+        surface = self.text(message, size, color)
+        rect = surface.get_rect(center=self.win.get_rect().center)
+        self.win.blit(surface, rect)
+        pygame.display.update(rect)
+        self.stale_rects.append(rect)
@@ -0,0 +1,117 @@
+# replay_buffer.py
+# Author: Henry Shi
+
+import numpy as np
+from batch_env import ACTIONS
+
+_ACTION_IDS = {action: index for index, action in enumerate(ACTIONS)}
+_LOW_MASK = (1 << 64) - 1
+
+class ReplayBuffer:
+    def __init__(self, capacity, alpha=0.6, seed=None, num_features=None):
+        """
+        Initialize a fixed-size ring buffer of transitions in NumPy arrays.
+
+        Packed states are stored as two uint64 halves, or feature vectors as
+        num_features floats. Once full, the oldest transition is overwritten,
+        so memory stays the same however long training runs.
+
+        Parameters:
+        capacity (int): Maximum number of transitions kept
+        alpha (float): How strongly prioritized sampling follows the priorities (0 is uniform)
+        seed (int): Seed for sampling
+        num_features (int): Store states as feature vectors of this length
+                            (see linear_agent), None for packed states
+        """
+        self.capacity = capacity
+        self.alpha = alpha
+        self.rng = np.random.default_rng(seed)
+        self.num_features = num_features
+        state_shape, state_type = ((capacity, num_features), np.float64) if num_features else ((capacity, 2), np.uint64)
+        self.states = np.zeros(state_shape, dtype=state_type)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(state_shape, dtype=state_type)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.priorities = np.zeros(capacity, dtype=np.float64)
+        self.max_priority = 1.0
+        self.position = 0  # Slot the next transition is written to
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        """
+        Add a transition, with the highest priority seen so far.
+
+        Parameters:
+        state (int or np.ndarray): The packed state, or its features
+        action (str): The action taken ('flip' or 'move')
+        reward (float): The received reward
+        next_state (int or np.ndarray): The packed next state, or its features
+        done (bool): Whether the game ended
+        """
+        i = self.position
+        if self.num_features:
+            self.states[i] = state
+            self.next_states[i] = next_state
+        else:
+            self.states[i] = (state & _LOW_MASK, state >> 64)
+            self.next_states[i] = (next_state & _LOW_MASK, next_state >> 64)
+        self.actions[i] = _ACTION_IDS[action]
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.priorities[i] = self.max_priority
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size, prioritized=False, beta=0.4):
+        """
+        Sample a minibatch of transitions.
+
+        Parameters:
+        batch_size (int): Number of transitions to sample
+        prioritized (bool): Sample in proportion to priority ** alpha instead of uniformly
+        beta (float): Strength of the importance-sampling correction for prioritized sampling
+
+        Returns:
+        tuple: The sampled slots, a list of (state, action, reward, next state, done)
+               transitions, and an importance-sampling weight per transition
+               (all 1 for uniform sampling)
+        """
+        if prioritized:
+            scaled = self.priorities[:self.size] ** self.alpha
+            probabilities = scaled / scaled.sum()
+            indices = self.rng.choice(self.size, batch_size, p=probabilities)
+            weights = (self.size * probabilities[indices]) ** -beta
+            weights /= weights.max()
+        else:
+            indices = self.rng.integers(0, self.size, batch_size)
+            weights = np.ones(batch_size)
+        if self.num_features:
+            transitions = list(zip(
+                self.states[indices], [ACTIONS[action] for action in self.actions[indices].tolist()],
+                self.rewards[indices].tolist(), self.next_states[indices], self.dones[indices].tolist()))
+            return indices, transitions, weights
+        states = self.states[indices].tolist()
+        next_states = self.next_states[indices].tolist()
+        transitions = [
+            (low | high << 64, ACTIONS[action], reward, next_low | next_high << 64, done)
+            for (low, high), action, reward, (next_low, next_high), done in zip(
+                states, self.actions[indices].tolist(), self.rewards[indices].tolist(),
+                next_states, self.dones[indices].tolist())
+        ]
+        return indices, transitions, weights
+
+    def update_priorities(self, indices, priorities):
+        """
+        Set the priorities of sampled transitions, usually their absolute TD errors.
+
+        Parameters:
+        indices (np.ndarray): The slots returned by sample
+        priorities (np.ndarray): The new priorities
+        """
+        priorities = np.maximum(priorities, 1e-6)  # Keep every transition reachable
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(priorities.max()))
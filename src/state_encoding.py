@@ -0,0 +1,137 @@
+# state_encoding.py
+# Author: Henry Shi
+
+import pickle
+import sys
+from board import COLS, HIDDEN_NIBBLE, NUM_SQUARES, OWNER_BIT, RANK_IDS, RANK_MASK, RANKS, ROWS, STATE_NIBBLES
+
+# Size of a packed state as bytes (4 bits per square)
+STATE_BYTES = NUM_SQUARES // 2
+
+# Cell returned by decode_state for a face-down piece
+HIDDEN_CELL = (None, None, False)
+
+# Maps every square value byte to its nibble, for bytes.translate
+_NIBBLE_TABLE = bytes(STATE_NIBBLES[code] if code < len(STATE_NIBBLES) else 0 for code in range(256))
+
+def encode_squares(squares):
+    """
+    Pack encoded square values into a state key.
+
+    Gives the same value as Board.state_key, without needing a Board.
+
+    Parameters:
+    squares (bytes): The 32 encoded square values (as in Board.squares)
+
+    Returns:
+    int: The packed state
+    """
+    nibbles = bytes(squares).translate(_NIBBLE_TABLE)
+    return int.from_bytes(bytes(low | high << 4 for low, high in zip(nibbles[0::2], nibbles[1::2])), 'little')
+
+def state_to_bytes(state):
+    """
+    Convert a packed state to its fixed-width byte form.
+
+    Parameters:
+    state (int): The packed state
+
+    Returns:
+    bytes: STATE_BYTES bytes, little-endian
+    """
+    return state.to_bytes(STATE_BYTES, 'little')
+
+def state_from_bytes(data):
+    """
+    Convert the fixed-width byte form back to a packed state.
+
+    Parameters:
+    data (bytes): STATE_BYTES bytes, little-endian
+
+    Returns:
+    int: The packed state
+    """
+    return int.from_bytes(data, 'little')
+
+def decode_state(state):
+    """
+    Unpack a state key into rows of cells.
+
+    Parameters:
+    state (int): The packed state
+
+    Returns:
+    tuple: 4 rows of 8 cells, each None (empty), HIDDEN_CELL (face down) or
+           (rank, player, True) for a revealed piece
+    """
+    cells = []
+    for index in range(NUM_SQUARES):
+        nibble = (state >> (4 * index)) & 0x0F
+        if not nibble:
+            cells.append(None)
+        elif nibble == HIDDEN_NIBBLE:
+            cells.append(HIDDEN_CELL)
+        else:
+            cells.append((RANKS[nibble & RANK_MASK], 2 if nibble & OWNER_BIT else 1, True))
+    return tuple(tuple(cells[row * COLS:(row + 1) * COLS]) for row in range(ROWS))
+
+def legacy_state_key(state):
+    """
+    Pack a state in the old Board.get_state tuple format.
+
+    Parameters:
+    state (tuple): 4 rows of 8 cells, None or (rank, player, revealed)
+
+    Returns:
+    int: The packed state
+    """
+    key = 0
+    index = 0
+    for row in state:
+        for cell in row:
+            if cell is not None:
+                rank, player, revealed = cell
+                nibble = (RANK_IDS[rank] | (OWNER_BIT if player == 2 else 0)) if revealed else HIDDEN_NIBBLE
+                key |= nibble << (4 * index)
+            index += 1
+    return key
+
+def convert_q_table(q_table):
+    """
+    Re-key a Q-table from tuple states to packed states.
+
+    The packed state does not say which piece is face down on each square,
+    so old states that differ only in their hidden pieces become one entry
+    holding the average of their values.
+
+    Parameters:
+    q_table (dict): Q-table keyed by (state, action), with tuple or packed states
+
+    Returns:
+    dict: Q-table keyed by (packed state, action)
+    """
+    totals = {}
+    for (state, action), value in q_table.items():
+        key = (legacy_state_key(state) if isinstance(state, tuple) else state, action)
+        total, count = totals.get(key, (0.0, 0))
+        totals[key] = (total + value, count + 1)
+    return {key: total / count for key, (total, count) in totals.items()}
+
+def convert_q_table_file(source, destination):
+    """
+    Convert a pickled Q-table file to packed state keys.
+
+    Parameters:
+    source (str): The pickled Q-table to read
+    destination (str): Where to write the converted Q-table
+    """
+    with open(source, 'rb') as f:
+        q_table = pickle.load(f)
+    with open(destination, 'wb') as f:
+        pickle.dump(convert_q_table(q_table), f)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python state_encoding.py OLD_Q_TABLE.pkl NEW_Q_TABLE.pkl")
+        sys.exit(1)
+    convert_q_table_file(sys.argv[1], sys.argv[2])
@@ -0,0 +1,116 @@
+# symmetry.py
+# Author: Henry Shi
+
+from board import COLS, HIDDEN_NIBBLE, NUM_SQUARES, OWNER_BIT, ROWS
+from state_encoding import STATE_BYTES
+
+# Transforms are bit flags: mirror left-right, mirror top-bottom, swap colors.
+# Every combination is its own inverse, so the same transform maps a state,
+# square or action to the canonical frame and back again.
+IDENTITY = 0
+MIRROR_COLS = 1
+MIRROR_ROWS = 2
+ROTATE_180 = MIRROR_COLS | MIRROR_ROWS
+COLOR_SWAP = 4
+GEOMETRIC_TRANSFORMS = (IDENTITY, MIRROR_COLS, MIRROR_ROWS, ROTATE_180)
+
+# Bytes per board row in a packed state (two squares per byte)
+_ROW_BYTES = COLS // 2
+
+# SQUARE_MAPS[transform][index]: where a square ends up under a geometric transform
+SQUARE_MAPS = tuple(
+    tuple(
+        (ROWS - 1 - index // COLS if transform & MIRROR_ROWS else index // COLS) * COLS
+        + (COLS - 1 - index % COLS if transform & MIRROR_COLS else index % COLS)
+        for index in range(NUM_SQUARES)
+    )
+    for transform in GEOMETRIC_TRANSFORMS
+)
+
+def _swap_color(nibble):
+    """Give a revealed piece's nibble to the other player; empty and face-down squares stay."""
+    return nibble ^ OWNER_BIT if 0 < nibble < HIDDEN_NIBBLE else nibble
+
+# Byte translation tables over packed states (two nibbles per byte)
+_NIBBLE_SWAP_TABLE = bytes((byte >> 4) | ((byte & 0x0F) << 4) for byte in range(256))
+_COLOR_SWAP_TABLE = bytes(_swap_color(byte & 0x0F) | (_swap_color(byte >> 4) << 4) for byte in range(256))
+
+def transform_state(state, transform):
+    """
+    Apply a transform to a packed state.
+
+    Parameters:
+    state (int): The packed state (see state_encoding)
+    transform (int): A combination of MIRROR_COLS, MIRROR_ROWS and COLOR_SWAP
+
+    Returns:
+    int: The transformed packed state
+    """
+    data = state.to_bytes(STATE_BYTES, 'little')
+    if transform & COLOR_SWAP:
+        data = data.translate(_COLOR_SWAP_TABLE)
+    if transform & MIRROR_COLS:
+        data = data.translate(_NIBBLE_SWAP_TABLE)
+        data = b''.join(data[start:start + _ROW_BYTES][::-1] for start in range(0, STATE_BYTES, _ROW_BYTES))
+    if transform & MIRROR_ROWS:
+        data = b''.join(data[start:start + _ROW_BYTES] for start in range(STATE_BYTES - _ROW_BYTES, -1, -_ROW_BYTES))
+    return int.from_bytes(data, 'little')
+
+def canonicalize(state, player=1):
+    """
+    Map a state to the representative shared by all its mirror images.
+
+    The representative is the smallest packed state among the four mirror
+    images. For player 2 the colors are swapped first, so both players see
+    their own pieces as player 1's.
+
+    Parameters:
+    state (int): The packed state
+    player (int): The player whose point of view the state is taken from
+
+    Returns:
+    tuple: The canonical state and the transform that produced it
+    """
+    base = COLOR_SWAP if player == 2 else IDENTITY
+    best_state, best_transform = None, None
+    for geometric in GEOMETRIC_TRANSFORMS:
+        transform = base | geometric
+        candidate = transform_state(state, transform)
+        if best_state is None or candidate < best_state:
+            best_state, best_transform = candidate, transform
+    return best_state, best_transform
+
+def transform_position(pos, transform):
+    """
+    Apply a transform to a board position.
+
+    Parameters:
+    pos (tuple): The (row, col) position
+    transform (int): The transform, color swap is ignored
+
+    Returns:
+    tuple: The transformed (row, col) position
+    """
+    row, col = pos
+    if transform & MIRROR_ROWS:
+        row = ROWS - 1 - row
+    if transform & MIRROR_COLS:
+        col = COLS - 1 - col
+    return (row, col)
+
+def map_action(action, transform):
+    """
+    Apply a transform to an action, e.g. to map a move found in the canonical frame back to the board.
+
+    Parameters:
+    action: A move (from_pos, to_pos), ('reveal', pos), an action name such as 'flip', or None
+    transform (int): The transform
+
+    Returns:
+    The transformed action; action names and None are returned unchanged
+    """
+    if action is None or isinstance(action, str) or not transform & ROTATE_180:
+        return action
+    if action[0] == 'reveal':
+        return ('reveal', transform_position(action[1], transform))
+    return (transform_position(action[0], transform), transform_position(action[1], transform))
@@ -0,0 +1,149 @@
+# train_ai_parallel.py
+# Author: Henry Shi
+
+import multiprocessing
+import random
+import time
+import numpy as np
+from metrics import NULL_METRICS
+from qlearning_agent import QLearningAgent
+from train_ai_without_display import play_episode
+
+def merge_q_tables(worker_updates):
+    """
+    Merge the updates of several workers.
+
+    Each entry becomes the average of the workers' values for it, weighted by
+    how many times each worker updated it.
+
+    Parameters:
+    worker_updates (list): One dict per worker mapping (state, action) to (value, visits).
+
+    Returns:
+    dict: The merged value of every (state, action) any worker updated.
+    """
+    totals = {}
+    for updates in worker_updates:
+        for key, (value, visits) in updates.items():
+            weighted_sum, total_visits = totals.get(key, (0.0, 0))
+            totals[key] = (weighted_sum + value * visits, total_visits + visits)
+    return {key: weighted_sum / total_visits for key, (weighted_sum, total_visits) in totals.items()}
+
+def _worker_seed(seed, sync_round, worker):
+    """Derive an independent seed for one worker in one round."""
+    return int(np.random.SeedSequence([seed, sync_round, worker]).generate_state(1)[0])
+
+def _self_play_worker(connection, q_table_1, q_table_2):
+    """
+    Worker process loop: keep a copy of the Q-tables and play rounds of episodes.
+
+    Each request carries the merged updates of the previous round, which bring
+    the local copies back in line with the master tables, followed by the
+    number of episodes to play and a seed. The reply holds this worker's
+    updates as dicts of (state, action) -> (value, visits). None stops the worker.
+
+    Parameters:
+    connection (multiprocessing.connection.Connection): Pipe to the trainer.
+    q_table_1 (dict): Initial Q-table of player 1.
+    q_table_2 (dict): Initial Q-table of player 2.
+    """
+    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1)
+    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2)
+    ai_agent_1.q_table = q_table_1
+    ai_agent_2.q_table = q_table_2
+
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        merged_1, merged_2, num_episodes, max_steps, seed = request
+        ai_agent_1.q_table.update(merged_1)
+        ai_agent_2.q_table.update(merged_2)
+        ai_agent_1.visit_counts = {}
+        ai_agent_2.visit_counts = {}
+        random.seed(seed)
+        np.random.seed(seed)
+
+        for _ in range(num_episodes):
+            play_episode(ai_agent_1, ai_agent_2, max_steps)
+
+        connection.send(tuple(
+            {key: (agent.q_table[key], visits) for key, visits in agent.visit_counts.items() if key in agent.q_table}
+            for agent in (ai_agent_1, ai_agent_2)
+        ))
+    connection.close()
+
+def train_agents_parallel(num_episodes=5000, max_steps=150, num_workers=None, sync_every=250, seed=0, capacity=None, metrics=NULL_METRICS):
+    """
+    Train two AI agents with self-play spread over several processes.
+
+    Each worker process keeps its own copy of the Q-tables. Every round, each
+    worker plays sync_every episodes with its own seed, and the trainer merges
+    their updates into the master tables. Only the merged entries are sent
+    back to the workers at the start of the next round.
+
+    Parameters:
+    num_episodes (int): Number of training episodes in total.
+    max_steps (int): Maximum steps per episode.
+    num_workers (int): Number of worker processes, defaults to the number of CPUs.
+    sync_every (int): Episodes each worker plays between merges.
+    seed (int): Base seed for the workers' random number generators.
+    capacity (int): Maximum Q-table entries per agent (in the trainer and each worker), None for no limit.
+    metrics (JsonlMetrics): Where to record the progress of every round.
+    """
+    num_workers = num_workers or multiprocessing.cpu_count()
+    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1, capacity=capacity)
+    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2, capacity=capacity)
+
+    #load previous Q-tables
+    try:
+        ai_agent_1.load_q_table('ai_agent_1_q_table.pkl')
+        ai_agent_2.load_q_table('ai_agent_2_q_table.pkl')
+        print("Q-tables loaded successfully.")
+    except FileNotFoundError:
+        print("No previous Q-tables found, starting fresh.")
+
+    workers = []
+    for _ in range(num_workers):
+        parent_end, child_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_self_play_worker, args=(child_end, ai_agent_1.q_table, ai_agent_2.q_table), daemon=True)
+        process.start()
+        child_end.close()
+        workers.append((process, parent_end))
+
+    start = time.perf_counter()
+    episodes_done = 0
+    sync_round = 0
+    merged_1, merged_2 = {}, {}
+    try:
+        while episodes_done < num_episodes:
+            remaining = num_episodes - episodes_done
+            batches = [min(sync_every, max(remaining - worker * sync_every, 0)) for worker in range(num_workers)]
+            for worker, (_, connection) in enumerate(workers):
+                connection.send((merged_1, merged_2, batches[worker], max_steps, _worker_seed(seed, sync_round, worker)))
+            results = [connection.recv() for _, connection in workers]
+
+            merged_1 = merge_q_tables([updates_1 for updates_1, _ in results])
+            merged_2 = merge_q_tables([updates_2 for _, updates_2 in results])
+            ai_agent_1.q_table.update(merged_1)
+            ai_agent_2.q_table.update(merged_2)
+
+            episodes_done += sum(batches)
+            sync_round += 1
+            elapsed = time.perf_counter() - start
+            print(f"Episode {episodes_done}/{num_episodes} completed ({episodes_done / elapsed:.0f} episodes/sec)")
+            if metrics.enabled:
+                metrics.emit('training', episodes=episodes_done, episodes_per_sec=episodes_done / elapsed,
+                             q_table_sizes=[ai_agent_1.table_size(), ai_agent_2.table_size()],
+                             merged_entries=[len(merged_1), len(merged_2)])
+    finally:
+        for process, connection in workers:
+            connection.send(None)
+            connection.close()
+            process.join()
+
+    ai_agent_1.save_q_table('ai_agent_1_q_table.pkl')
+    ai_agent_2.save_q_table('ai_agent_2_q_table.pkl')
+
+if __name__ == "__main__":
+    train_agents_parallel()
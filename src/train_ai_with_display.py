@@ -1,93 +1,238 @@
 # train_ai_with_display.py
 # Author: Henry Shi
 
+import argparse
 import pygame
 import sys
 import time
+from assets import load_piece_images
 from board import Board
 from qlearning_agent import QLearningAgent
-
-# Initialize Pygame
-pygame.init()
+from renderer import BLACK, BoardRenderer
 
 # Define constants
 WIDTH, HEIGHT = 800, 400
 ROWS, COLS = 4, 8
 SQUARE_SIZE = WIDTH // COLS
 
-# Define colors
-WHITE, BLACK, BLUE, RED, LIGHT_BLUE = (255, 255, 255), (0, 0, 0), (0, 0, 255), (255, 0, 0), (173, 216, 230)
-
-# Create window
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Flip Chess')
-
-# Load piece images (example)
-PIECE_IMAGES = {
-    'K_black': pygame.transform.scale(pygame.image.load('../images/king_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'K_white': pygame.transform.scale(pygame.image.load('../images/king_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'Q_black': pygame.transform.scale(pygame.image.load('../images/queen_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'Q_white': pygame.transform.scale(pygame.image.load('../images/queen_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'R_black': pygame.transform.scale(pygame.image.load('../images/rook_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'R_white': pygame.transform.scale(pygame.image.load('../images/rook_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'B_black': pygame.transform.scale(pygame.image.load('../images/bishop_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'B_white': pygame.transform.scale(pygame.image.load('../images/bishop_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'N_black': pygame.transform.scale(pygame.image.load('../images/knight_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'N_white': pygame.transform.scale(pygame.image.load('../images/knight_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'P_black': pygame.transform.scale(pygame.image.load('../images/pawn_black.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-    'P_white': pygame.transform.scale(pygame.image.load('../images/pawn_white.png'), (SQUARE_SIZE, SQUARE_SIZE)),
-}
-
-def draw_board(win, board):
-    """
-    Draw the game board.
+# The training window and its renderer, created by open_display
+WIN = None
+renderer = None
 
-    Parameters:
-    win (pygame.Surface): The game window.
-    board (Board): The game board.
-    """
-    win.fill(WHITE)
-    for row in range(ROWS):
-        for col in range(COLS):
-            color = LIGHT_BLUE if board.grid[row][col] is not None and not board.grid[row][col].revealed else (BLUE if (row + col) % 2 == 0 else RED)
-            pygame.draw.rect(win, color, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-            pygame.draw.rect(win, BLACK, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE), 1)
-
-def draw_pieces(win, board):
-    """
-    Draw the pieces on the board.
+def open_display():
+    """Initialize Pygame and open the training window, if it is not open yet."""
+    global WIN, renderer
+    if WIN is None:
+        pygame.init()
+        WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption('Flip Chess')
+        renderer = BoardRenderer(WIN, load_piece_images(SQUARE_SIZE), SQUARE_SIZE)
 
-    Parameters:
-    win (pygame.Surface): The game window.
-    board (Board): The game board.
-    """
-    for row in range(ROWS):
-        for col in range(COLS):
-            piece = board.grid[row][col]
-            if piece is not None and piece.revealed:
-                image_key = f"{piece.rank}_{'black' if piece.player == 1 else 'white'}"
-                win.blit(PIECE_IMAGES[image_key], (col * SQUARE_SIZE, row * SQUARE_SIZE))
-
-def update_display(board):
+# Lowest frame rate the Up key lowers target_fps to
+MIN_TARGET_FPS = 1
+
+# Seconds between checks for key presses while frames are being skipped
+POLL_INTERVAL = 0.05
+
+def update_display(board, texts=()):
     """
     Update the game display.
 
+    Only the squares that changed since the last update are repainted.
+
     Parameters:
     board (Board): The game board.
+    texts (list): Text to draw over the board, as (message, size, color, topleft).
     """
-    draw_board(WIN, board)
-    draw_pieces(WIN, board)
-    pygame.display.update()
+    open_display()
+    renderer.render(board, texts)
+
+class TrainingView:
+    def __init__(self, num_episodes, delay=0.2, render_every=1, target_fps=None, show_stats=False):
+        """
+        Initialize the view that shows training without holding it back.
+
+        Training calls after_action after every action. The board is only
+        drawn every render_every actions, or at most target_fps times a
+        second when that is set, and the delay is only slept after a drawn
+        frame. Between frames the keyboard is still checked a few times a
+        second:
+
+        Space: pause or resume
+        N or Right: play one action while paused
+        Up: halve the delay, then draw half as often (with target_fps set,
+            halve the frame rate)
+        Down: undo one press of Up, or double the delay
+
+        Parameters:
+        num_episodes (int): Number of training episodes.
+        delay (float): Delay after each drawn frame.
+        render_every (int): Actions between frames; ignored when target_fps is set.
+        target_fps (float): Most frames drawn per second, or None to draw by render_every.
+        show_stats (bool): Draw episodes/sec and win rates over the board.
+        """
+        self.num_episodes = num_episodes
+        self.delay = delay
+        self.render_every = render_every
+        self.target_fps = target_fps
+        self.show_stats = show_stats
+        self.paused = False
+        self.step_requested = False
+        self.quit_requested = False
+        self.actions = 0
+        self.episodes = 0
+        self.wins = [0, 0, 0]  # Draws, then wins of player 1 and 2
+        self.unfinished = 0
+        self.last_frame = 0.0
+        self.last_poll = 0.0
+        self.rate = 0.0  # Episodes/sec over the last second of training
+        self.rate_start = (time.perf_counter(), 0)
+        self.faster = []  # pace() before each press of Up not undone yet
+        self.slower = []  # pace() before each press of Down not undone yet
 
-def train_agents_with_display(num_episodes=10, max_steps=150, delay=0.2):
+    def pace(self):
+        """The settings the Up and Down keys change, as (delay, render_every, target_fps)."""
+        return (self.delay, self.render_every, self.target_fps)
+
+    def speed_up(self):
+        """
+        Train faster: undo the last press of Down if there is one, otherwise
+        halve the delay, or once there is none, draw half as often (with
+        target_fps set, halve the frame rate, down to MIN_TARGET_FPS).
+        """
+        if self.slower:
+            self.delay, self.render_every, self.target_fps = self.slower.pop()
+            return
+        self.faster.append(self.pace())
+        if self.delay > 0.001:
+            self.delay /= 2
+        else:
+            self.delay = 0
+            if self.target_fps:
+                self.target_fps = max(self.target_fps / 2, MIN_TARGET_FPS)
+            else:
+                self.render_every *= 2
+
+    def slow_down(self):
+        """
+        Train slower: undo the last press of Up if there is one, otherwise
+        double the delay (to at least 1 ms).
+        """
+        if self.faster:
+            self.delay, self.render_every, self.target_fps = self.faster.pop()
+            return
+        self.slower.append(self.pace())
+        self.delay = max(self.delay * 2, 0.001)
+
+    def handle_events(self):
+        """Handle key presses and closing the window."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit_requested = True
+            elif event.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.paused = not self.paused
+                elif event.key in (pygame.K_n, pygame.K_RIGHT):
+                    self.step_requested = True
+                elif event.key == pygame.K_UP:
+                    self.speed_up()
+                elif event.key == pygame.K_DOWN:
+                    self.slow_down()
+        self.last_poll = time.perf_counter()
+
+    def end_episode(self, winner):
+        """
+        Count a finished episode.
+
+        Parameters:
+        winner (int): The winner (1 or 2), 0 for a draw, None if the episode ran out of steps.
+        """
+        self.episodes += 1
+        if winner is None:
+            self.unfinished += 1
+        else:
+            self.wins[winner] += 1
+        now = time.perf_counter()
+        start_time, start_episodes = self.rate_start
+        if now - start_time >= 1.0:
+            self.rate = (self.episodes - start_episodes) / (now - start_time)
+            self.rate_start = (now, self.episodes)
+
+    def pace_help(self):
+        """
+        Get the on-screen help for the Up and Down keys.
+
+        Returns:
+        str: What the keys change in the current mode
+        """
+        if self.target_fps:
+            return "Up/Down: shorter/longer delay, then fewer/more frames per second"
+        return "Up/Down: shorter/longer delay, then draw less/more often"
+
+    def overlay(self):
+        """
+        Get the text drawn over the board.
+
+        Returns:
+        list: Text as (message, size, color, topleft) for update_display
+        """
+        texts = []
+        if self.show_stats:
+            count = max(self.episodes, 1)
+            texts.append((f"Episode {self.episodes}/{self.num_episodes}  {self.rate:.1f} episodes/sec", 24, BLACK, (10, 10)))
+            texts.append((f"Wins P1 {self.wins[1] / count:.0%}  P2 {self.wins[2] / count:.0%}  "
+                          f"draws {self.wins[0] / count:.0%}  unfinished {self.unfinished / count:.0%}", 24, BLACK, (10, 34)))
+        if self.paused:
+            texts.append(("Paused: Space to resume, N to step", 24, BLACK, (10, 346)))
+            texts.append((self.pace_help(), 24, BLACK, (10, 370)))
+        elif self.show_stats:
+            pace = f"{self.target_fps:g} fps" if self.target_fps else f"every {self.render_every} actions"
+            texts.append((f"Drawing {pace}, delay {self.delay * 1000:.0f} ms", 24, BLACK, (10, 370)))
+        return texts
+
+    def after_action(self, board):
+        """
+        Draw the board if a frame is due, handle the keyboard and wait while paused.
+
+        Parameters:
+        board (Board): The game board.
+        """
+        self.actions += 1
+        now = time.perf_counter()
+        if self.target_fps:
+            frame_due = now - self.last_frame >= 1 / self.target_fps
+        else:
+            frame_due = self.actions % self.render_every == 0
+        if frame_due or now - self.last_poll >= POLL_INTERVAL:
+            self.handle_events()
+        if frame_due or self.paused:
+            update_display(board, self.overlay())
+            self.last_frame = now
+            if self.delay and not self.paused:
+                time.sleep(self.delay)
+        while self.paused and not self.step_requested and not self.quit_requested:
+            time.sleep(1 / 30)
+            self.handle_events()
+            update_display(board, self.overlay())
+        self.step_requested = False
+
+def train_agents_with_display(num_episodes=10, max_steps=150, delay=0.2, render_every=1, target_fps=None,
+                              show_stats=False):
     """
     Train two AI agents with visual display.
 
     Parameters:
     num_episodes (int): Number of training episodes.
     max_steps (int): Maximum steps per episode.
-    delay (float): Delay between steps for visualization.
+    delay (float): Delay after each drawn frame.
+    render_every (int): Actions between drawn frames; ignored when target_fps is set.
+    target_fps (float): Most frames drawn per second, or None to draw by render_every.
+    show_stats (bool): Draw episodes/sec and win rates over the board.
     """
+    open_display()
+    view = TrainingView(num_episodes, delay, render_every, target_fps, show_stats)
     ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1)
     ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2)
 
@@ -111,11 +256,8 @@ def train_agents_with_display(num_episodes=10, max_steps=150, delay=0.2):
             next_state_1, reward_1, done_1, action_detail_1 = ai_agent_1.step(state_1, action_1, board, step_count)
             ai_agent_1.update_q_table(state_1, action_1, reward_1, next_state_1)
 
-            # Update display and sleep
-            update_display(board)
-            time.sleep(delay)
-
-            if done_1:
+            view.after_action(board)
+            if done_1 or view.quit_requested:
                 break
 
             # AI 2 takes action
@@ -123,9 +265,9 @@ def train_agents_with_display(num_episodes=10, max_steps=150, delay=0.2):
             next_state_2, reward_2, done_2, action_detail_2 = ai_agent_2.step(state_2, action_2, board, step_count)
             ai_agent_2.update_q_table(state_2, action_2, reward_2, next_state_2)
 
-            # Update display and sleep
-            update_display(board)
-            time.sleep(delay)
+            view.after_action(board)
+            if view.quit_requested:
+                break
 
             # Update states and check if the game is done
             state_1 = next_state_1
@@ -134,13 +276,33 @@ def train_agents_with_display(num_episodes=10, max_steps=150, delay=0.2):
 
             step_count += 1
 
+        view.end_episode(board.check_winner(step_count))
+        if view.quit_requested:
+            print(f"Window closed, stopping after {episode + 1} episodes.")
+            break
         if (episode + 1) % 1000 == 0:
             print(f"Episode {episode + 1}/{num_episodes} completed")
 
     ai_agent_1.save_q_table('ai_agent_1_q_table.pkl')
     ai_agent_2.save_q_table('ai_agent_2_q_table.pkl')
 
+def main():
+    """Parse the command line and run visual training."""
+    parser = argparse.ArgumentParser(description="Train the Q-learning agents while watching them play")
+    parser.add_argument('--episodes', type=int, default=10, help="Number of training episodes")
+    parser.add_argument('--max-steps', type=int, default=150, help="Maximum steps per episode")
+    parser.add_argument('--delay', type=float,
+                        help="Seconds to wait after each drawn frame (default 0.2 when every action is drawn, else 0)")
+    parser.add_argument('--render-every', type=int, default=1, help="Actions between drawn frames")
+    parser.add_argument('--fps', type=float, help="Draw at most this many frames per second instead")
+    parser.add_argument('--stats', action='store_true', help="Show episodes/sec and win rates")
+    args = parser.parse_args()
+    delay = args.delay
+    if delay is None:
+        delay = 0.2 if args.fps is None and args.render_every == 1 else 0
+    train_agents_with_display(args.episodes, args.max_steps, delay, args.render_every, args.fps, args.stats)
+
 if __name__ == "__main__":
-    train_agents_with_display()
+    main()
     pygame.quit()
     sys.exit()
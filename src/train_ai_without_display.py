@@ -1,19 +1,81 @@
 # train_ai_without_display.py
 # Author: Henry Shi
 
+import time
 from board import Board
+from metrics import NULL_METRICS
 from qlearning_agent import QLearningAgent
+from replay_buffer import ReplayBuffer
 
-def train_agents_without_display(num_episodes=5000, max_steps=150):
+def play_episode(ai_agent_1, ai_agent_2, max_steps=150, metrics=NULL_METRICS):
+    """
+    Play one training game between two agents, updating their Q-tables.
+
+    Parameters:
+    ai_agent_1 (QLearningAgent): The agent playing as player 1.
+    ai_agent_2 (QLearningAgent): The agent playing as player 2.
+    max_steps (int): Maximum steps per episode.
+    metrics (JsonlMetrics): Where to record the length, result and rewards of the game.
+
+    Returns:
+    tuple: The board at the end of the game, the number of steps played and
+           the total reward of each agent as [reward_1, reward_2].
+    """
+    board = Board()
+    state_1 = ai_agent_1.get_state(board)
+    state_2 = ai_agent_2.get_state(board)
+    done = False
+    step_count = 0
+    total_rewards = [0, 0]
+
+    while not done and step_count < max_steps:
+        # AI 1 takes action
+        action_1 = ai_agent_1.choose_action(state_1, board)
+        next_state_1, reward_1, done_1, action_detail_1 = ai_agent_1.step(state_1, action_1, board, step_count)
+        ai_agent_1.update_q_table(state_1, action_1, reward_1, next_state_1)
+        ai_agent_1.remember(state_1, action_1, reward_1, next_state_1, done_1)
+        total_rewards[0] += reward_1
+
+        if done_1:
+            break
+
+        # AI 2 takes action
+        action_2 = ai_agent_2.choose_action(state_2, board)
+        next_state_2, reward_2, done_2, action_detail_2 = ai_agent_2.step(state_2, action_2, board, step_count)
+        ai_agent_2.update_q_table(state_2, action_2, reward_2, next_state_2)
+        ai_agent_2.remember(state_2, action_2, reward_2, next_state_2, done_2)
+        total_rewards[1] += reward_2
+
+        # Update states and check if the game is done
+        state_1 = next_state_1
+        state_2 = next_state_2
+        done = done_1 or done_2
+
+        step_count += 1
+
+    if metrics.enabled:
+        metrics.emit('episode', steps=step_count, winner=board.check_winner(step_count), rewards=total_rewards)
+    return board, step_count, total_rewards
+
+def train_agents_without_display(num_episodes=5000, max_steps=150, capacity=None,
+                                 replay_capacity=None, replay_batch_size=64, prioritized=False, metrics=NULL_METRICS):
     """
     Train two AI agents without visual display.
 
     Parameters:
     num_episodes (int): Number of training episodes.
     max_steps (int): Maximum steps per episode.
+    capacity (int): Maximum Q-table entries per agent, None for no limit.
+    replay_capacity (int): Transitions kept for experience replay, None to learn online only.
+    replay_batch_size (int): Transitions each agent replays after every episode.
+    prioritized (bool): Replay by TD error instead of uniformly.
+    metrics (JsonlMetrics): Where to record every episode and the progress reports.
     """
-    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1)
-    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2)
+    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1, capacity=capacity)
+    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2, capacity=capacity)
+    if replay_capacity:
+        ai_agent_1.replay_buffer = ReplayBuffer(replay_capacity)
+        ai_agent_2.replay_buffer = ReplayBuffer(replay_capacity)
 
     #load previous Q-tables
     try:
@@ -23,36 +85,19 @@ def train_agents_without_display(num_episodes=5000, max_steps=150):
     except FileNotFoundError:
         print("No previous Q-tables found, starting fresh.")
 
+    start = time.perf_counter()
     for episode in range(num_episodes):
-        board = Board()
-        state_1 = ai_agent_1.get_state(board)
-        state_2 = ai_agent_2.get_state(board)
-        done = False
-        step_count = 0
-
-        while not done and step_count < max_steps:
-            # AI 1 takes action
-            action_1 = ai_agent_1.choose_action(state_1, board)
-            next_state_1, reward_1, done_1, action_detail_1 = ai_agent_1.step(state_1, action_1, board, step_count)
-            ai_agent_1.update_q_table(state_1, action_1, reward_1, next_state_1)
-
-            if done_1:
-                break
-
-            # AI 2 takes action
-            action_2 = ai_agent_2.choose_action(state_2, board)
-            next_state_2, reward_2, done_2, action_detail_2 = ai_agent_2.step(state_2, action_2, board, step_count)
-            ai_agent_2.update_q_table(state_2, action_2, reward_2, next_state_2)
-
-            # Update states and check if the game is done
-            state_1 = next_state_1
-            state_2 = next_state_2
-            done = done_1 or done_2
-
-            step_count += 1
+        play_episode(ai_agent_1, ai_agent_2, max_steps, metrics)
+        ai_agent_1.replay(replay_batch_size, prioritized)
+        ai_agent_2.replay(replay_batch_size, prioritized)
 
         if (episode + 1) % 1000 == 0:
             print(f"Episode {episode + 1}/{num_episodes} completed")
+            if metrics.enabled:
+                metrics.emit('training', episodes=episode + 1, episodes_per_sec=(episode + 1) / (time.perf_counter() - start),
+                             q_table_sizes=[ai_agent_1.table_size(), ai_agent_2.table_size()])
+            if capacity:
+                print(f"Q-table stats: {ai_agent_1.q_table.stats()} / {ai_agent_2.q_table.stats()}")
 
     ai_agent_1.save_q_table('ai_agent_1_q_table.pkl')
     ai_agent_2.save_q_table('ai_agent_2_q_table.pkl')
@@ -0,0 +1,250 @@
+# train_runner.py
+# Author: Henry Shi
+
+import argparse
+import os
+import pickle
+import random
+import signal
+import tempfile
+import time
+import numpy as np
+from metrics import NULL_METRICS, JsonlMetrics
+from qlearning_agent import QLearningAgent
+from qtable import BoundedQTable
+from qtable_store import LOG_SUFFIX, QTableStore, new_file_mode, write_q_table
+from train_ai_without_display import play_episode
+
+# Name of the file holding the counters and RNG states of a checkpoint
+CHECKPOINT_STATE = 'checkpoint.pkl'
+
+def _atomic_pickle(obj, filename):
+    """Pickle an object to a temporary file next to filename, then move it into place."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_name, new_file_mode())
+        os.replace(temp_name, filename)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+def _fsync_directory(directory):
+    """Sync a directory, so the files renamed into it survive a crash."""
+    if os.name == 'nt':
+        # Windows cannot open a directory as a file, and renames there are durable already
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def save_checkpoint(checkpoint_dir, episode, ai_agent_1, ai_agent_2, totals):
+    """
+    Save a checkpoint of a training run.
+
+    The Q-tables are written to files named after the episode and synced to
+    disk, then the state file naming them is replaced atomically, then older
+    tables are removed; a table still opened from an older file is switched
+    to the new one first. The state file also holds the visit counts and
+    order of bounded Q-tables, so they evict the same entries after a resume.
+    A crash at any point leaves the previous checkpoint or the new one, never
+    a mix of both.
+
+    Parameters:
+    checkpoint_dir (str): Directory of the checkpoint
+    episode (int): Number of episodes played so far
+    ai_agent_1 (QLearningAgent): The agent playing as player 1
+    ai_agent_2 (QLearningAgent): The agent playing as player 2
+    totals (dict): Running totals of the run (see run_training)
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    table_names = [f'ai_agent_{player}_q_table.{episode}' for player in (1, 2)]
+    for agent, table_name in zip((ai_agent_1, ai_agent_2), table_names):
+        if isinstance(agent.q_table, QTableStore):
+            agent.q_table.save(os.path.join(checkpoint_dir, table_name))
+        else:
+            write_q_table(os.path.join(checkpoint_dir, table_name), agent.q_table)
+    _fsync_directory(checkpoint_dir)
+    _atomic_pickle({
+        'episode': episode,
+        'q_tables': table_names,
+        'table_usage': [agent.q_table.usage_state() if isinstance(agent.q_table, BoundedQTable) else None
+                        for agent in (ai_agent_1, ai_agent_2)],
+        'random_state': random.getstate(),
+        'numpy_state': np.random.get_state(),
+        'totals': totals,
+    }, os.path.join(checkpoint_dir, CHECKPOINT_STATE))
+    _fsync_directory(checkpoint_dir)
+    # A table loaded from an older checkpoint is still mapped from its file,
+    # which cannot be removed on Windows; it moves to the copy just written
+    for agent, table_name in zip((ai_agent_1, ai_agent_2), table_names):
+        table_file = os.path.join(checkpoint_dir, table_name)
+        if isinstance(agent.q_table, QTableStore) and os.path.abspath(agent.q_table.filename) != os.path.abspath(table_file):
+            agent.q_table.reopen(table_file)
+    for name in os.listdir(checkpoint_dir):
+        table_name = name[:-len(LOG_SUFFIX)] if name.endswith(LOG_SUFFIX) else name
+        if name.startswith('ai_agent_') and table_name not in table_names and not name.endswith('.tmp'):
+            os.unlink(os.path.join(checkpoint_dir, name))
+
+def load_checkpoint(checkpoint_dir, ai_agent_1, ai_agent_2):
+    """
+    Restore a training run from its checkpoint.
+
+    Loads the Q-tables into the agents, with the eviction state of bounded
+    tables, and restores the random number generators to where they were
+    when the checkpoint was saved.
+
+    Parameters:
+    checkpoint_dir (str): Directory of the checkpoint
+    ai_agent_1 (QLearningAgent): The agent playing as player 1
+    ai_agent_2 (QLearningAgent): The agent playing as player 2
+
+    Returns:
+    tuple: The number of episodes played and the running totals, or None if there is no checkpoint
+    """
+    state_file = os.path.join(checkpoint_dir, CHECKPOINT_STATE)
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, 'rb') as f:
+        state = pickle.load(f)
+    table_usage = state.get('table_usage', [None, None])
+    for agent, table_name, usage in zip((ai_agent_1, ai_agent_2), state['q_tables'], table_usage):
+        table_file = os.path.join(checkpoint_dir, table_name)
+        agent.load_q_table(table_file)
+        if usage is not None and isinstance(agent.q_table, BoundedQTable):
+            saved = QTableStore(table_file)
+            agent.q_table.restore_usage(usage, saved)
+            saved.close()
+    random.setstate(state['random_state'])
+    np.random.set_state(state['numpy_state'])
+    return state['episode'], state['totals']
+
+def _new_interval():
+    """Counters of one logging interval."""
+    return {'episodes': 0, 'wins': [0, 0, 0], 'unfinished': 0, 'steps': 0, 'rewards': [0, 0]}
+
+def run_training(num_episodes, max_steps=150, seed=0, checkpoint_dir='checkpoints', checkpoint_every=1000,
+                 log_every=100, resume=True, capacity=None, metrics=NULL_METRICS):
+    """
+    Train two Q-learning agents by self-play with periodic checkpoints.
+
+    A checkpoint holds both Q-tables, the episode counter and the state of
+    the random number generators, so a resumed run plays the same episodes
+    an uninterrupted run would have. SIGTERM and Ctrl-C let the current
+    episode finish, then save a checkpoint and stop.
+
+    Parameters:
+    num_episodes (int): Total number of episodes of the run
+    max_steps (int): Maximum steps per episode
+    seed (int): Seed of a fresh run
+    checkpoint_dir (str): Directory the checkpoint is kept in
+    checkpoint_every (int): Episodes between checkpoints
+    log_every (int): Episodes between progress reports
+    resume (bool): Continue from the checkpoint in checkpoint_dir if there is one
+    capacity (int): Maximum Q-table entries per agent, None for no limit
+    metrics (JsonlMetrics): Where to record a 'progress' record per interval
+
+    Returns:
+    tuple: The two agents and the number of episodes played so far
+    """
+    ai_agent_1 = QLearningAgent(actions=['flip', 'move'], player=1, capacity=capacity)
+    ai_agent_2 = QLearningAgent(actions=['flip', 'move'], player=2, capacity=capacity)
+
+    restored = load_checkpoint(checkpoint_dir, ai_agent_1, ai_agent_2) if resume else None
+    if restored is not None:
+        episode, totals = restored
+        print(f"Resuming from episode {episode}.")
+    else:
+        episode, totals = 0, {'wins': [0, 0, 0], 'unfinished': 0}
+        random.seed(seed)
+        np.random.seed(seed)
+
+    stop_requested = []
+    def request_stop(signum, frame):
+        stop_requested.append(signum)
+    previous_handlers = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+    interval = _new_interval()
+    start = time.perf_counter()
+    start_episode = episode
+    try:
+        while episode < num_episodes and not stop_requested:
+            board, steps, rewards = play_episode(ai_agent_1, ai_agent_2, max_steps)
+            episode += 1
+            winner = board.check_winner(steps)
+            interval['episodes'] += 1
+            interval['steps'] += steps
+            interval['rewards'][0] += rewards[0]
+            interval['rewards'][1] += rewards[1]
+            if winner is None:
+                interval['unfinished'] += 1
+                totals['unfinished'] += 1
+            else:
+                interval['wins'][winner] += 1
+                totals['wins'][winner] += 1
+
+            if episode % log_every == 0 or episode == num_episodes:
+                count = interval['episodes']
+                progress = {
+                    'episode': episode,
+                    'episodes_per_sec': (episode - start_episode) / (time.perf_counter() - start),
+                    'win_rate_1': interval['wins'][1] / count,
+                    'win_rate_2': interval['wins'][2] / count,
+                    'draw_rate': interval['wins'][0] / count,
+                    'unfinished_rate': interval['unfinished'] / count,
+                    'avg_reward_1': interval['rewards'][0] / count,
+                    'avg_reward_2': interval['rewards'][1] / count,
+                    'avg_steps': interval['steps'] / count,
+                }
+                print(f"Episode {episode}/{num_episodes}: win rates {progress['win_rate_1']:.2f}/{progress['win_rate_2']:.2f}, "
+                      f"avg steps {progress['avg_steps']:.1f}, {progress['episodes_per_sec']:.0f} episodes/sec")
+                metrics.emit('progress', **progress)
+                interval = _new_interval()
+
+            if episode % checkpoint_every == 0:
+                save_checkpoint(checkpoint_dir, episode, ai_agent_1, ai_agent_2, totals)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    if episode % checkpoint_every:
+        save_checkpoint(checkpoint_dir, episode, ai_agent_1, ai_agent_2, totals)
+    if stop_requested:
+        print(f"Stopped at episode {episode}, checkpoint saved.")
+    return ai_agent_1, ai_agent_2, episode
+
+def main():
+    """Parse the command line and run training."""
+    parser = argparse.ArgumentParser(description="Checkpointed self-play training of the Q-learning agents")
+    parser.add_argument('--episodes', type=int, default=5000, help="Total episodes of the run")
+    parser.add_argument('--max-steps', type=int, default=150, help="Maximum steps per episode")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of a fresh run")
+    parser.add_argument('--checkpoint-dir', default='checkpoints', help="Directory of the checkpoint")
+    parser.add_argument('--checkpoint-every', type=int, default=1000, help="Episodes between checkpoints")
+    parser.add_argument('--log-every', type=int, default=100, help="Episodes between progress reports")
+    parser.add_argument('--no-resume', action='store_true', help="Start fresh even if a checkpoint exists")
+    parser.add_argument('--capacity', type=int, help="Maximum Q-table entries per agent")
+    parser.add_argument('--metrics', help="Append progress records to this JSONL file")
+    parser.add_argument('--output-1', default='ai_agent_1_q_table.pkl', help="Where to save player 1's Q-table")
+    parser.add_argument('--output-2', default='ai_agent_2_q_table.pkl', help="Where to save player 2's Q-table")
+    args = parser.parse_args()
+
+    metrics = JsonlMetrics(args.metrics) if args.metrics else NULL_METRICS
+    try:
+        ai_agent_1, ai_agent_2, episode = run_training(
+            args.episodes, args.max_steps, args.seed, args.checkpoint_dir, args.checkpoint_every,
+            args.log_every, not args.no_resume, args.capacity, metrics)
+    finally:
+        metrics.close()
+    if episode >= args.episodes:
+        ai_agent_1.save_q_table(args.output_1)
+        ai_agent_2.save_q_table(args.output_2)
+
+if __name__ == "__main__":
+    main()
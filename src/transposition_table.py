@@ -0,0 +1,68 @@
+# transposition_table.py
+# Author: Henry Shi
+
+# Bound types of a stored score
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+class TranspositionTable:
+    def __init__(self, capacity=1 << 16):
+        """
+        Initialize a fixed-capacity transposition table.
+
+        Parameters:
+        capacity (int): The number of slots, rounded up to a power of two
+        """
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Start a new search so entries from earlier searches can be replaced first."""
+        self.generation += 1
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Parameters:
+        key (int): The Zobrist key of the position
+
+        Returns:
+        tuple: The entry (key, depth, score, bound, best_move, generation), or None
+        """
+        self.probes += 1
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Store a search result, keeping the deeper result when two positions share a slot.
+
+        Parameters:
+        key (int): The Zobrist key of the position
+        depth (int): The remaining depth the position was searched to
+        score (float): The score found
+        bound (int): EXACT, LOWER_BOUND or UPPER_BOUND
+        best_move (tuple): The best move found, or None
+        """
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, score, bound, best_move, self.generation)
+            self.stores += 1
+
+    def clear(self):
+        """Remove all entries."""
+        self.slots = [None] * len(self.slots)
+
+    def __len__(self):
+        return sum(1 for entry in self.slots if entry is not None)
@@ -0,0 +1,71 @@
+# test_batch_env.py
+# Author: Henry Shi
+
+import random
+import numpy as np
+import qlearning_agent
+from batch_env import ACTIONS, BatchEnv
+from board import COLS, NUM_SQUARES
+from qlearning_agent import QLearningAgent
+
+# Offsets of BatchEnv's move directions: up, down, left, right
+DIRECTIONS = {(-1, 0): 0, (1, 0): 1, (0, -1): 2, (0, 1): 3}
+
+class ScriptedRng:
+    """Stands in for the batch's generator so it picks the square or move the agent picked."""
+    def __init__(self, rng):
+        self.rng = rng
+        self.pick = 0
+
+    def permuted(self, *args, **kwargs):
+        return self.rng.permuted(*args, **kwargs)
+
+    def random(self, shape):
+        scores = np.zeros(shape)
+        if shape[0]:
+            scores[0, self.pick] = 1.0
+        return scores
+
+def test_single_game_matches_agent_step(monkeypatch):
+    env = BatchEnv(1, max_steps=150, seed=4)
+    env.rng = ScriptedRng(env.rng)
+    agents = {player: QLearningAgent(actions=list(ACTIONS), player=player) for player in (1, 2)}
+    rng = random.Random(4)
+    picks = []
+    def choose(options):
+        picks.append(rng.choice(options))
+        return picks[-1]
+    monkeypatch.setattr(qlearning_agent.random, 'choice', choose)
+
+    board = env.to_board(0)
+    games = 0
+    for _ in range(3000):
+        player = int(env.player[0])
+        step_count = int(env.plies[0]) // 2
+        last_ply = int(env.plies[0]) + 1 >= 2 * env.max_steps
+        # Moving without a legal move ends the game, so it is kept rare to let
+        # most games run until one side wins or the step limit
+        can_move = bool(board.valid_moves(player))
+        action = 'move' if rng.random() < (0.7 if can_move else 0.02) else 'flip'
+        picks.clear()
+        agent = agents[player]
+        _, reward, done, _ = agent.step(agent.get_state(board), action, board, step_count)
+        winner = board.check_winner(step_count)
+
+        if picks and isinstance(picks[0][0], int):
+            row, col = picks[0]
+            env.rng.pick = row * COLS + col
+        elif picks:
+            (row, col), (to_row, to_col) = picks[0]
+            env.rng.pick = DIRECTIONS[(to_row - row, to_col - col)] * NUM_SQUARES + row * COLS + col
+        rewards, dones, winners = env.step([ACTIONS.index(action)])
+
+        assert rewards[0] == reward
+        assert dones[0] == (done or last_ply)
+        if dones[0]:
+            assert winners[0] == (-1 if winner is None else winner)
+            games += 1
+            board = env.to_board(0)
+        else:
+            assert bytes(env.squares()[0]) == bytes(board.squares)
+    assert games >= 5
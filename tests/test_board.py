@@ -0,0 +1,105 @@
+# test_board.py
+# Author: Henry Shi
+
+import random
+from board import SCORE_STEP_LIMIT, Board
+
+# A plain reference of the rules: the grid is a list of rows holding
+# [rank, player, revealed] lists or None for an empty square
+RANK_ORDER = {'P': 1, 'N': 2, 'B': 3, 'R': 4, 'Q': 5, 'K': 6}
+VALUES = {'K': 10, 'Q': 7, 'R': 5, 'B': 4, 'N': 2.5, 'P': 1}
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+def can_capture(attacker, victim):
+    if attacker == 'K':
+        return victim != 'P'
+    if attacker == 'P':
+        return victim in ('K', 'P')
+    return RANK_ORDER[victim] <= RANK_ORDER[attacker]
+
+def can_step(grid, from_pos, to_pos):
+    """Check a move or capture by a piece, whether or not it is revealed."""
+    row, col = to_pos
+    if not (0 <= row < 4 and 0 <= col < 8):
+        return False
+    piece, target = grid[from_pos[0]][from_pos[1]], grid[row][col]
+    if target is None:
+        return True
+    return target[2] and target[1] != piece[1] and can_capture(piece[0], target[0])
+
+def reference_moves(grid, player, revealed_only=True):
+    moves = []
+    for row in range(4):
+        for col in range(8):
+            piece = grid[row][col]
+            if piece and piece[1] == player and (piece[2] or not revealed_only):
+                for dr, dc in DIRECTIONS:
+                    if can_step(grid, (row, col), (row + dr, col + dc)):
+                        moves.append(((row, col), (row + dr, col + dc)))
+    return moves
+
+def reference_score(grid, player):
+    return sum(VALUES[piece[0]] for row in grid for piece in row if piece and piece[1] == player)
+
+def reference_winner(grid, step_count):
+    pieces = [piece for row in grid for piece in row if piece]
+    if not all(piece[2] for piece in pieces):
+        return None
+    if not any(piece[1] == 1 for piece in pieces):
+        return 2
+    if not any(piece[1] == 2 for piece in pieces):
+        return 1
+    if not reference_moves(grid, 1, False):
+        return 2
+    if not reference_moves(grid, 2, False):
+        return 1
+    if step_count >= SCORE_STEP_LIMIT:
+        score_1, score_2 = reference_score(grid, 1), reference_score(grid, 2)
+        return 1 if score_1 > score_2 else 2 if score_2 > score_1 else 0
+    return None
+
+def reference_play(grid, from_pos, to_pos):
+    piece, target = grid[from_pos[0]][from_pos[1]], grid[to_pos[0]][to_pos[1]]
+    grid[from_pos[0]][from_pos[1]] = None
+    grid[to_pos[0]][to_pos[1]] = None if target and target[0] == piece[0] else piece
+
+def check_same(board, grid, step_count):
+    assert board.get_state() == tuple(tuple(tuple(piece) if piece else None for piece in row) for row in grid)
+    assert board.unrevealed_positions() == [(r, c) for r in range(4) for c in range(8) if grid[r][c] and not grid[r][c][2]]
+    for player in (1, 2):
+        assert board.valid_moves(player) == reference_moves(grid, player)
+        assert board.calculate_score(player) == reference_score(grid, player)
+    for steps in (step_count, SCORE_STEP_LIMIT):
+        assert board.check_winner(steps) == reference_winner(grid, steps)
+
+def test_random_playouts_match_reference_rules():
+    winners = set()
+    for seed in range(40):
+        rng = random.Random(seed)
+        board = Board(rng=rng)
+        grid = [[list(piece) if piece else None for piece in row] for row in board.get_state()]
+        player = 1
+        for ply in range(2 * SCORE_STEP_LIMIT + 2):
+            step_count = ply // 2
+            check_same(board, grid, step_count)
+            winner = reference_winner(grid, step_count)
+            if winner is not None:
+                winners.add(winner)
+                break
+            moves = reference_moves(grid, player)
+            hidden = [(r, c) for r in range(4) for c in range(8) if grid[r][c] and not grid[r][c][2]]
+            if hidden and (not moves or rng.random() < 0.4):
+                row, col = rng.choice(hidden)
+                board.apply_reveal((row, col))
+                grid[row][col][2] = True
+            elif moves:
+                from_pos, to_pos = rng.choice(moves)
+                if rng.random() < 0.5:
+                    board.apply_move(from_pos, to_pos)
+                elif grid[to_pos[0]][to_pos[1]] is None:
+                    board.move_piece(from_pos, to_pos)
+                else:
+                    board.capture_piece(from_pos, to_pos)
+                reference_play(grid, from_pos, to_pos)
+            player = 3 - player
+    assert winners >= {1, 2}
@@ -0,0 +1,67 @@
+# test_linear_agent.py
+# Author: Henry Shi
+
+import random
+import numpy as np
+import pytest
+from linear_agent import NUM_FEATURES, LinearAgent
+from replay_buffer import ReplayBuffer
+from train_ai_without_display import play_episode
+
+def feature_buffer(count, seed=0):
+    """A feature replay buffer holding count random transitions."""
+    rng = np.random.default_rng(seed)
+    buffer = ReplayBuffer(256, seed=seed, num_features=NUM_FEATURES)
+    for i in range(count):
+        buffer.add(rng.random(NUM_FEATURES), ('flip', 'move')[i % 2], 1.0, rng.random(NUM_FEATURES), i % 5 == 4)
+    return buffer
+
+def test_replay_uses_feature_vectors():
+    agent = LinearAgent(player=1)
+    agent.replay_buffer = feature_buffer(32)
+    assert len(agent.replay_buffer) >= 16
+    agent.replay(16)
+    after_uniform = agent.weights.copy()
+    assert after_uniform.any()
+    agent.replay(16, prioritized=True)
+    assert not np.array_equal(after_uniform, agent.weights)
+
+def test_replay_with_too_few_transitions_does_nothing():
+    agent = LinearAgent(player=1)
+    agent.replay_buffer = feature_buffer(8)
+    agent.replay(16)
+    assert not agent.weights.any()
+
+def test_self_play_fills_the_feature_buffer():
+    random.seed(0)
+    np.random.seed(0)
+    agent_1 = LinearAgent(player=1, epsilon=0.0)
+    agent_2 = LinearAgent(player=2, epsilon=0.0)
+    agent_1.replay_buffer = ReplayBuffer(256, seed=0, num_features=NUM_FEATURES)
+    play_episode(agent_1, agent_2, max_steps=40)
+    assert len(agent_1.replay_buffer) >= 16
+    agent_1.replay(16)
+    assert agent_1.weights.any()
+
+def test_packed_state_buffer_is_rejected():
+    agent_1 = LinearAgent(player=1)
+    agent_1.replay_buffer = ReplayBuffer(256)
+    with pytest.raises(ValueError):
+        play_episode(agent_1, LinearAgent(player=2), max_steps=40)
+
+def test_update_is_the_mean_over_each_action():
+    agent = LinearAgent(alpha=1.0, gamma=0.0)
+    state = np.ones(NUM_FEATURES)
+    # One 'flip' and three 'move' experiences with the same error each: both
+    # actions should move by the same amount
+    agent.update_q_table_from_experience([(state, 'flip', 1.0, state)] + [(state, 'move', 1.0, state)] * 3)
+    assert np.allclose(agent.weights[0], agent.weights[1])
+
+def test_save_applies_queued_transitions(tmp_path):
+    agent = LinearAgent(batch_size=32)
+    state = np.ones(NUM_FEATURES)
+    agent.update_q_table(state, 'move', 1.0, state)
+    agent.save_q_table(str(tmp_path / 'weights.npy'))
+    assert not agent.pending
+    assert agent.weights.any()
+    assert agent.table_size() == agent.weights.size
@@ -0,0 +1,72 @@
+# test_minmax_agent.py
+# Author: Henry Shi
+
+import random
+from board import Board
+from minmax_agent import MinMaxAgent
+
+def reveal_positions(count, seed=0):
+    """Random positions where player 1 has no move and must choose between several reveals."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        squares = bytearray(Board().squares)
+        rng.shuffle(squares)
+        board = Board(squares)
+        player = 1
+        for step in range(rng.randint(4, 20)):
+            actions = board.valid_moves(player) + [('reveal', pos) for pos in board.unrevealed_positions()]
+            if not actions or board.check_winner(step) is not None:
+                break
+            action = rng.choice(actions)
+            if action[0] == 'reveal':
+                board.apply_reveal(action[1])
+            else:
+                board.apply_move(*action)
+            player = 3 - player
+        if (player == 1 and not board.valid_moves(1) and len(board.unrevealed_positions()) > 1
+                and board.check_winner(10) is None):
+            boards.append(board)
+    return boards
+
+def test_warm_table_picks_the_same_root_reveal():
+    for board in reveal_positions(8):
+        fresh = MinMaxAgent(depth=3, player=1, alpha_beta=True, tt_capacity=1 << 14, seed=1)
+        warm = MinMaxAgent(depth=3, player=1, alpha_beta=True, tt_capacity=1 << 14, seed=1)
+        # Fill the table as a search reaching this position below the root would
+        warm.killers = [[None, None] for _ in range(5)]
+        warm.alphabeta(board, 3, float('-inf'), float('inf'), True, 10, 1)
+        assert warm.choose_action(board, 10) == fresh.choose_action(board, 10)
+
+def revealed_positions(count, seed=0):
+    """Random fully revealed positions with the game still going."""
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        squares = bytearray(Board().squares)
+        rng.shuffle(squares)
+        board = Board(squares)
+        for pos in board.unrevealed_positions():
+            board.apply_reveal(pos)
+        player = 1
+        for _ in range(rng.randint(5, 30)):
+            moves = board.valid_moves(player)
+            if not moves:
+                break
+            board.apply_move(*rng.choice(moves))
+            player = 3 - player
+        if board.check_winner(0) is None:
+            boards.append(board)
+    return boards
+
+def test_table_entries_do_not_cross_the_step_limit():
+    for board in revealed_positions(5):
+        fresh = MinMaxAgent(depth=4, player=1, alpha_beta=True, tt_capacity=1 << 16)
+        warm = MinMaxAgent(depth=4, player=1, alpha_beta=True, tt_capacity=1 << 16)
+        scores = []
+        for agent, step_counts in ((warm, (100, 147)), (fresh, (147,))):
+            for step_count in step_counts:
+                agent.killers = [[None, None] for _ in range(5)]
+                score, _ = agent.alphabeta(board, 4, float('-inf'), float('inf'), True, step_count)
+            scores.append(score)
+        assert scores[0] == scores[1]
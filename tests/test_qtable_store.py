@@ -0,0 +1,70 @@
+# test_qtable_store.py
+# Author: Henry Shi
+
+import os
+import stat
+import qtable_store
+from qtable_store import LOG_SUFFIX, QTableStore, new_file_mode, write_q_table
+
+def test_written_table_has_default_permissions(tmp_path):
+    filename = str(tmp_path / 'table')
+    write_q_table(filename, {(1, 'flip'): 0.5, (2, 'move'): -1.0})
+    assert stat.S_IMODE(os.stat(filename).st_mode) == new_file_mode()
+    table = QTableStore(filename)
+    assert table.get((1, 'flip')) == 0.5
+    assert table.get((2, 'move')) == -1.0
+    table.close()
+
+def test_updates_survive_save_and_reopen(tmp_path):
+    filename = str(tmp_path / 'table')
+    write_q_table(filename, {(1, 'flip'): 0.5})
+    table = QTableStore(filename)
+    table[(1, 'flip')] = 0.75
+    table[(2, 'move')] = -1.0
+    table.save(filename)
+    table.close()
+    assert os.path.exists(filename + LOG_SUFFIX)
+
+    table = QTableStore(filename)
+    assert table.get((1, 'flip')) == 0.75
+    assert table.get((2, 'move')) == -1.0
+    table[(3, 'flip')] = 2.0
+    table.save(filename)
+    table.close()
+
+    table = QTableStore(filename)
+    assert dict(table.items()) == {(1, 'flip'): 0.75, (2, 'move'): -1.0, (3, 'flip'): 2.0}
+    assert len(table) == 3
+    table.close()
+
+def test_compaction_merges_the_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(qtable_store, 'COMPACT_MIN_RECORDS', 2)
+    filename = str(tmp_path / 'table')
+    write_q_table(filename, {(1, 'flip'): 0.5})
+    table = QTableStore(filename)
+    expected = {(1, 'flip'): 0.5}
+    for state in range(2, 6):
+        table[(state, 'move')] = float(state)
+        expected[(state, 'move')] = float(state)
+    table.flush()
+    assert not os.path.exists(filename + LOG_SUFFIX)
+    assert dict(table.items()) == expected
+    table.close()
+
+    table = QTableStore(filename)
+    assert table._count == len(expected)
+    assert dict(table.items()) == expected
+    table.close()
+
+def test_rewriting_a_table_drops_its_log(tmp_path):
+    filename = str(tmp_path / 'table')
+    write_q_table(filename, {(1, 'flip'): 0.5})
+    table = QTableStore(filename)
+    table[(1, 'flip')] = 9.0
+    table.flush()
+    table.close()
+    write_q_table(filename, {(1, 'flip'): 0.25})
+    assert not os.path.exists(filename + LOG_SUFFIX)
+    table = QTableStore(filename)
+    assert table.get((1, 'flip')) == 0.25
+    table.close()
@@ -0,0 +1,31 @@
+# test_train_ai_with_display.py
+# Author: Henry Shi
+
+from train_ai_with_display import TrainingView
+
+def test_down_undoes_up():
+    for view in (TrainingView(10, delay=0.2), TrainingView(10, delay=0.2, target_fps=30)):
+        start = view.pace()
+        for presses in (1, 3, 10):
+            for _ in range(presses):
+                view.speed_up()
+            for _ in range(presses):
+                view.slow_down()
+            assert view.pace() == start
+
+def test_up_undoes_down():
+    view = TrainingView(10, delay=0.2)
+    for _ in range(3):
+        view.slow_down()
+    assert view.delay == 1.6
+    for _ in range(3):
+        view.speed_up()
+    assert view.pace() == (0.2, 1, None)
+
+def test_up_skips_frames_once_the_delay_is_gone():
+    view = TrainingView(10, delay=0, target_fps=30)
+    view.speed_up()
+    assert view.pace() == (0, 1, 15)
+    view = TrainingView(10, delay=0)
+    view.speed_up()
+    assert view.pace() == (0, 2, None)
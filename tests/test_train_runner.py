@@ -0,0 +1,31 @@
+# test_train_runner.py
+# Author: Henry Shi
+
+import os
+from qtable_store import QTableStore
+from train_runner import run_training
+
+def test_resumed_bounded_run_matches_uninterrupted_run(tmp_path):
+    full = str(tmp_path / 'full')
+    part = str(tmp_path / 'part')
+    a1, a2, _ = run_training(60, seed=3, checkpoint_dir=full, checkpoint_every=20, log_every=1000, capacity=300)
+    run_training(30, seed=3, checkpoint_dir=part, checkpoint_every=20, log_every=1000, capacity=300)
+    b1, b2, episode = run_training(60, seed=3, checkpoint_dir=part, checkpoint_every=20, log_every=1000, capacity=300)
+    assert episode == 60
+    assert a1.q_table.evictions > 0
+    for uninterrupted, resumed in ((a1, b1), (a2, b2)):
+        assert list(uninterrupted.q_table.items()) == list(resumed.q_table.items())
+        assert uninterrupted.q_table.visits == resumed.q_table.visits
+        assert uninterrupted.q_table.stats() == resumed.q_table.stats()
+
+def test_resumed_table_moves_to_the_new_checkpoint(tmp_path):
+    checkpoint_dir = str(tmp_path / 'run')
+    run_training(20, seed=1, checkpoint_dir=checkpoint_dir, checkpoint_every=10, log_every=1000)
+    a1, a2, episode = run_training(40, seed=1, checkpoint_dir=checkpoint_dir, checkpoint_every=10, log_every=1000)
+    assert episode == 40
+    for agent in (a1, a2):
+        assert isinstance(agent.q_table, QTableStore)
+        assert os.path.basename(agent.q_table.filename).endswith('.40')
+        assert os.path.exists(agent.q_table.filename)
+        agent.q_table.close()
+    assert sorted(os.listdir(checkpoint_dir)) == ['ai_agent_1_q_table.40', 'ai_agent_2_q_table.40', 'checkpoint.pkl']